@@ -0,0 +1,81 @@
+"""Per-update JSON cost of each codec: Bot API response parsing, request payload and FSM data round trip.
+
+Run: python -m benchmarks.json_codec --updates 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import TYPE_CHECKING, Any
+
+from src.utils.enum import JsonCodecEnum
+from src.utils.json_codec import STDLIB_CODEC, get_json_codec
+
+if TYPE_CHECKING:
+    from src.utils.json_codec import JsonCodec
+
+GET_UPDATES_RESPONSE: dict[str, Any] = {
+    "ok": True,
+    "result": [
+        {
+            "update_id": 100_000_001,
+            "message": {
+                "message_id": 42,
+                "from": {
+                    "id": 123_456_789,
+                    "is_bot": False,
+                    "first_name": "David",
+                    "last_name": "King",
+                    "username": "david_k",
+                    "language_code": "en",
+                },
+                "chat": {
+                    "id": 123_456_789,
+                    "first_name": "David",
+                    "last_name": "King",
+                    "username": "david_k",
+                    "type": "private",
+                },
+                "date": 1_760_000_000,
+                "text": "/start",
+                "entities": [{"offset": 0, "length": 6, "type": "bot_command"}],
+            },
+        }
+    ],
+}
+SEND_MESSAGE_PAYLOAD: dict[str, Any] = {
+    "chat_id": 123_456_789,
+    "text": "Hello, David King! Welcome to the bot!",
+    "parse_mode": "HTML",
+    "reply_markup": {"inline_keyboard": [[{"text": "Help", "callback_data": "help"}]]},
+}
+FSM_DATA: dict[str, Any] = {"step": 2, "answers": ["yes", "no", "maybe"], "profile": {"age": 30, "city": "London"}}
+
+
+def handle_update(codec: JsonCodec, raw_response: bytes) -> None:
+    codec.loads(raw_response)
+    codec.dumps(SEND_MESSAGE_PAYLOAD)
+    codec.loads(codec.dumps(FSM_DATA))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=100_000)
+    args = parser.parse_args()
+
+    raw_response = STDLIB_CODEC.dumps(GET_UPDATES_RESPONSE).encode()
+    for name in (JsonCodecEnum.STDLIB, JsonCodecEnum.ORJSON):
+        codec = get_json_codec(name)
+        if codec.name != name:
+            print(f"{name:<10} not installed")
+            continue
+        started = time.perf_counter()
+        for _ in range(args.updates):
+            handle_update(codec, raw_response)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<10} {elapsed:8.3f}s {elapsed / args.updates * 1e6:8.2f} us/update")
+
+
+if __name__ == "__main__":
+    main()
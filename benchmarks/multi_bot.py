@@ -0,0 +1,228 @@
+"""Memory and connections per bot: N bots served by one process against one process per bot.
+
+Every process builds what `main()` builds for its bots: a `DatabaseManager` pool, a Redis client and one
+`Dispatcher` with the `/start` stack and activity tracking. Each bot gets `--updates` synthetic updates through
+`MockedBot`. Once every process is warm, the parent reads their RSS and counts their Postgres and Redis
+connections by `application_name` and client name.
+
+Run (needs the test Postgres and Redis from `docker compose --profile test up -d`):
+    python -m benchmarks.multi_bot --bots 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import gc
+import logging
+import os
+import sys
+from dataclasses import dataclass
+
+from aiogram import Dispatcher
+from aiogram.fsm.storage.base import DefaultKeyBuilder
+from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.methods import SendMessage
+from aiogram.types import Chat, Message, Update
+from redis.asyncio import Redis
+from sqlalchemy import delete, text
+
+from src.core.db_manager import DatabaseManager
+from src.core.models import BaseOrm, UserCounterOrm, UserOrm
+from src.handlers.commands import router as commands_router
+from src.middlewares import ActivityMiddleware, SessionDepMiddleware, TextsDepMiddleware
+from src.utils.activity import ActivityTracker
+from tests.config import test_db_manager, test_settings
+from tests.mock_bot import MockedBot
+
+APP_NAME = "multi_bot_benchmark"
+ACTIVITY_PREFIX = "bench_activity"
+# Far above real Telegram ids, so the benchmark users are easy to remove afterwards
+TG_ID_BASE = 7_000_000_000_000
+BOT_ID_BASE = 7_000_000
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+@dataclass(slots=True)
+class LayoutResult:
+    name: str
+    processes: int
+    bots: int
+    rss: int
+    pg_connections: int
+    redis_connections: int
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * PAGE_SIZE
+
+
+def make_update(bot: MockedBot, update_id: int, users: int) -> Update:
+    tg_id = TG_ID_BASE + update_id % users
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": datetime.datetime.now(),
+                "chat": {"id": tg_id, "type": "private"},
+                "from": {"id": tg_id, "is_bot": False, "first_name": "Bench", "username": f"bench_{tg_id}"},
+                "text": "/start",
+            },
+        },
+        context={"bot": bot},
+    )
+
+
+async def feed(dp: Dispatcher, bot: MockedBot, updates: int, users: int, concurrency: int) -> None:
+    reply = Message(message_id=1, date=datetime.datetime.now(), chat=Chat(id=1, type="private"), text="ok")
+    for batch_start in range(0, updates, concurrency):
+        batch = range(batch_start, min(batch_start + concurrency, updates))
+        for _ in batch:
+            bot.add_result_for(SendMessage, ok=True, result=reply)
+        await asyncio.gather(*(dp.feed_update(bot, make_update(bot, update_id, users)) for update_id in batch))
+        bot.session.requests.clear()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    """Child process: serve `--bot-ids` like `main()` does, report RSS and hold connections until stdin closes."""
+    manager = DatabaseManager(
+        url=test_settings.db.url,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        connect_args={"server_settings": {"application_name": APP_NAME}},
+    )
+    redis = Redis.from_url(test_settings.redis.url, client_name=APP_NAME)
+    bots = [MockedBot(token=f"{bot_id}:BENCHMARK") for bot_id in args.bot_ids]
+    trackers = {
+        bot.id: ActivityTracker(redis=redis, key_prefix=f"{ACTIVITY_PREFIX}:{bot.id}", bot_id=bot.id) for bot in bots
+    }
+
+    dp = Dispatcher(storage=RedisStorage(redis=redis, key_builder=DefaultKeyBuilder(with_bot_id=True)))
+    dp.include_router(commands_router)
+    commands_router.message.middleware(TextsDepMiddleware())
+    dp.update.outer_middleware.register(ActivityMiddleware(trackers=trackers))
+    dp.update.outer_middleware.register(SessionDepMiddleware(session_factory=manager.session_factory))
+
+    await asyncio.gather(
+        *(feed(dp, bot, updates=args.updates, users=args.users, concurrency=args.concurrency) for bot in bots)
+    )
+    gc.collect()
+    print(f"READY {rss_bytes()}", flush=True)
+    await asyncio.get_running_loop().run_in_executor(None, sys.stdin.read)
+
+    await redis.aclose()
+    await manager.engine.dispose()
+
+
+async def count_connections(redis: Redis) -> tuple[int, int]:
+    async with test_db_manager.engine.connect() as conn:
+        stmt = text("SELECT count(*) FROM pg_stat_activity WHERE application_name = :name")
+        pg_connections: int = (await conn.execute(stmt, {"name": APP_NAME})).scalar_one()
+    clients = await redis.client_list()
+    return pg_connections, sum(1 for client in clients if client.get("name") == APP_NAME)
+
+
+async def run_layout(args: argparse.Namespace, name: str, groups: list[list[int]], redis: Redis) -> LayoutResult:
+    processes = [
+        await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "benchmarks.multi_bot",
+            "--serve",
+            "--bot-ids",
+            *map(str, group),
+            "--updates",
+            str(args.updates),
+            "--users",
+            str(args.users),
+            "--concurrency",
+            str(args.concurrency),
+            "--pool-size",
+            str(args.pool_size),
+            "--max-overflow",
+            str(args.max_overflow),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        for group in groups
+    ]
+    try:
+        rss = 0
+        for process in processes:
+            assert process.stdout is not None
+            line = (await process.stdout.readline()).decode()
+            if not line.startswith("READY"):
+                raise RuntimeError("Benchmark process exited before becoming ready")
+            rss += int(line.split()[1])
+        pg_connections, redis_connections = await count_connections(redis)
+    finally:
+        for process in processes:
+            assert process.stdin is not None
+            process.stdin.close()
+        await asyncio.gather(*(process.wait() for process in processes))
+    return LayoutResult(
+        name=name,
+        processes=len(processes),
+        bots=sum(len(group) for group in groups),
+        rss=rss,
+        pg_connections=pg_connections,
+        redis_connections=redis_connections,
+    )
+
+
+async def cleanup(bot_ids: list[int], redis: Redis) -> None:
+    async with test_db_manager.session_factory() as session, session.begin():
+        await session.execute(delete(UserOrm).where(UserOrm.bot_id.in_(bot_ids)))
+        await session.execute(delete(UserCounterOrm).where(UserCounterOrm.bot_id.in_(bot_ids)))
+    keys = [key async for key in redis.scan_iter(match=f"{ACTIVITY_PREFIX}:*")]
+    if keys:
+        await redis.delete(*keys)
+
+
+async def compare(args: argparse.Namespace) -> None:
+    async with test_db_manager.engine.begin() as conn:
+        await conn.run_sync(BaseOrm.metadata.create_all)
+    bot_ids = [BOT_ID_BASE + number for number in range(args.bots)]
+    redis = Redis.from_url(test_settings.redis.url)
+    try:
+        results = [
+            await run_layout(args, f"1 process x {args.bots} bots", [bot_ids], redis),
+            await run_layout(args, f"{args.bots} processes x 1 bot", [[bot_id] for bot_id in bot_ids], redis),
+        ]
+    finally:
+        await cleanup(bot_ids, redis)
+        await redis.aclose()
+        await test_db_manager.engine.dispose()
+
+    print(f"{'layout':<26} {'RSS MiB':>9} {'MiB/bot':>8} {'PG conns':>9} {'Redis conns':>12}")
+    for result in results:
+        print(
+            f"{result.name:<26} {result.rss / 2**20:>9.1f} {result.rss / result.bots / 2**20:>8.1f} "
+            f"{result.pg_connections:>9} {result.redis_connections:>12}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bots", type=int, default=20)
+    parser.add_argument("--updates", type=int, default=2_000, help="Updates fed to every bot")
+    parser.add_argument("--users", type=int, default=500, help="Distinct users sending /start to every bot")
+    parser.add_argument("--concurrency", type=int, default=20, help="Updates in flight per bot")
+    parser.add_argument("--pool-size", type=int, default=10, help="DB pool size of every process")
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--bot-ids", type=int, nargs="+", default=[], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.serve:
+        await serve(args)
+    else:
+        await compare(args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+"""Soak test: memory growth while synthetic /start updates go through the real dispatcher stack.
+
+Updates run through `Dispatcher`, `SessionDepMiddleware`, `TextsDepMiddleware`, the `/start` handler
+and `UserRepository` against the test database, with `MockedBot` answering the Bot API.
+`tracemalloc` snapshots and RSS samples are taken every `--snapshot-every` updates after a warm-up,
+and the run exits with status 1 when traced memory grows by more than `--budget-kb` per 100k updates.
+
+Run (needs the test Postgres from `docker compose --profile test up -d`):
+    python -m benchmarks.soak --updates 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+from aiogram import Dispatcher
+from aiogram.methods import SendMessage
+from aiogram.types import Chat, Message, Update
+from sqlalchemy import delete
+
+from src.core.models import BaseOrm, UserOrm
+from src.handlers.commands import router as commands_router
+from src.middlewares import SessionDepMiddleware, TextsDepMiddleware
+from src.repository import UserStatsRepository
+from src.repository.base import bot_session_info
+from tests.config import test_db_manager
+from tests.mock_bot import MockedBot
+
+# Far above real Telegram ids, so the soak users are easy to remove afterwards
+TG_ID_BASE = 8_000_000_000_000
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+TRACE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * PAGE_SIZE
+
+
+def make_update(bot: MockedBot, update_id: int, users: int) -> Update:
+    tg_id = TG_ID_BASE + update_id % users
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": datetime.datetime.now(),
+                "chat": {"id": tg_id, "type": "private"},
+                "from": {"id": tg_id, "is_bot": False, "first_name": "Soak", "username": f"soak_{tg_id}"},
+                "text": "/start",
+            },
+        },
+        context={"bot": bot},
+    )
+
+
+def build_dispatcher() -> Dispatcher:
+    dp = Dispatcher()
+    dp.include_router(commands_router)
+    commands_router.message.middleware(TextsDepMiddleware())
+    dp.update.outer_middleware.register(SessionDepMiddleware(session_factory=test_db_manager.session_factory))
+    return dp
+
+
+async def feed(dp: Dispatcher, bot: MockedBot, start: int, count: int, users: int, concurrency: int) -> None:
+    reply = Message(message_id=1, date=datetime.datetime.now(), chat=Chat(id=1, type="private"), text="ok")
+    for batch_start in range(start, start + count, concurrency):
+        batch = range(batch_start, min(batch_start + concurrency, start + count))
+        for _ in batch:
+            bot.add_result_for(SendMessage, ok=True, result=reply)
+        await asyncio.gather(*(dp.feed_update(bot, make_update(bot, update_id, users)) for update_id in batch))
+        # MockedSession keeps every request for assertions, which would look like a leak here
+        bot.session.requests.clear()
+
+
+async def cleanup(bot_id: int) -> None:
+    async with test_db_manager.session_factory(info=bot_session_info(bot_id)) as session, session.begin():
+        await session.execute(delete(UserOrm).where(UserOrm.bot_id == bot_id, UserOrm.tg_id >= TG_ID_BASE))
+        await UserStatsRepository.reconcile(session=session, keep_days=31)
+
+
+async def soak(args: argparse.Namespace, bot: MockedBot) -> int:
+    async with test_db_manager.engine.begin() as conn:
+        await conn.run_sync(BaseOrm.metadata.create_all)
+    dp = build_dispatcher()
+    await dp.emit_startup(bot=bot)
+
+    print(f"Warm-up: {args.warmup:,} updates")
+    await feed(dp, bot, start=0, count=args.warmup, users=args.users, concurrency=args.concurrency)
+
+    tracemalloc.start(args.frames)
+    baseline = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+    baseline_traced, baseline_rss = tracemalloc.get_traced_memory()[0], rss_bytes()
+    print(f"{'updates':>12} {'traced MiB':>11} {'RSS MiB':>9} {'updates/s':>10}")
+
+    key_type = "traceback" if args.frames > 1 else "lineno"
+    done = 0
+    snapshot = baseline
+    started = time.perf_counter()
+    while done < args.updates:
+        count = min(args.snapshot_every, args.updates - done)
+        await feed(dp, bot, start=args.warmup + done, count=count, users=args.users, concurrency=args.concurrency)
+        done += count
+        traced = tracemalloc.get_traced_memory()[0]
+        rate = done / (time.perf_counter() - started)
+        print(f"{done:>12,} {traced / 2**20:>11.1f} {rss_bytes() / 2**20:>9.1f} {rate:>10,.0f}")
+        previous, snapshot = snapshot, tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        for stat in snapshot.compare_to(previous, key_type)[:3]:
+            print(f"{'':>14}{stat.size_diff / 1024:+10.1f} KiB  {stat.traceback[-1]}")
+
+    traced_growth = (tracemalloc.get_traced_memory()[0] - baseline_traced) / done * 100_000
+    rss_growth = (rss_bytes() - baseline_rss) / done * 100_000
+    tracemalloc.stop()
+    await dp.emit_shutdown(bot=bot)
+
+    print(f"\nTop {args.top} growing allocation sites:")
+    for stat in snapshot.compare_to(baseline, key_type)[: args.top]:
+        print(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  {stat.traceback[-1]}")
+
+    print(f"\nGrowth per 100k updates: traced {traced_growth / 1024:+.1f} KiB, RSS {rss_growth / 1024:+.1f} KiB")
+    if traced_growth / 1024 > args.budget_kb:
+        print(f"FAIL: traced memory grew past the budget of {args.budget_kb} KiB per 100k updates")
+        return 1
+    print("OK")
+    return 0
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=1_000_000)
+    parser.add_argument("--warmup", type=int, default=20_000, help="Updates fed before the baseline snapshot")
+    parser.add_argument("--users", type=int, default=10_000, help="Distinct users sending /start")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--snapshot-every", type=int, default=100_000)
+    parser.add_argument("--budget-kb", type=float, default=1024, help="Allowed traced growth per 100k updates")
+    parser.add_argument("--frames", type=int, default=1, help="Traceback depth stored by tracemalloc")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    bot = MockedBot()
+    try:
+        return await soak(args, bot=bot)
+    finally:
+        await cleanup(bot_id=bot.id)
+        await test_db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
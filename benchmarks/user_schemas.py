@@ -0,0 +1,80 @@
+"""Rows/sec of `UserOrm` -> `UserS` conversion strategies.
+
+Run: python -m benchmarks.user_schemas --rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from src.core.models import UserOrm
+from src.core.schemas import UserS, orm_to_schemas, rows_to_schemas
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def seed(session: Session, rows: int) -> None:
+    session.execute(
+        insert(UserOrm),
+        [
+            {
+                "tg_id": 1_000_000 + i,
+                "first_name": f"user{i}",
+                "username": f"user_{i}" if i % 2 else None,
+                "last_name": None,
+            }
+            for i in range(rows)
+        ],
+    )
+    session.commit()
+
+
+def measure(name: str, rows: int, fn: Callable[[], Any]) -> None:
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    assert len(result) == rows
+    print(f"{name:<40} {elapsed:8.3f}s {rows / elapsed:12,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # In-memory SQLite keeps the benchmark focused on conversion, not on network I/O
+    engine = create_engine("sqlite://")
+    UserOrm.metadata.create_all(engine, tables=[UserOrm.__table__])  # type: ignore[list-item]
+
+    with Session(engine) as session:
+        seed(session, args.rows)
+
+        instances = session.scalars(select(UserOrm)).all()
+        rows = session.execute(select(*UserOrm.__table__.columns)).all()
+
+        measure("model_validate per ORM instance", args.rows, lambda: [UserS.model_validate(i) for i in instances])
+        measure("orm_to_schemas (TypeAdapter)", args.rows, lambda: orm_to_schemas(UserS, instances))
+        measure("rows_to_schemas (TypeAdapter)", args.rows, lambda: rows_to_schemas(UserS, rows))
+
+        session.expunge_all()
+        measure(
+            "select ORM + model_validate per row",
+            args.rows,
+            lambda: [UserS.model_validate(i) for i in session.scalars(select(UserOrm)).all()],
+        )
+        session.expunge_all()
+        measure(
+            "select columns + rows_to_schemas",
+            args.rows,
+            lambda: rows_to_schemas(UserS, session.execute(select(*UserOrm.__table__.columns)).all()),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,299 @@
 import asyncio
 import logging
+from collections.abc import Mapping, Sequence
+from functools import partial
 
-from aiogram import Bot, Dispatcher
+from aiogram import BaseMiddleware, Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.redis import RedisStorage
+from redis.asyncio import Redis
 
 from src.config import settings
 from src.core import db_manager
+from src.handlers.admin import router as admin_router
 from src.handlers.commands import router as commands_router
-from src.middlewares import SessionDepMiddleware, TextsDepMiddleware
+from src.jobs import JobQueue
+from src.middlewares import (
+    ActivityMiddleware,
+    AdmissionMiddleware,
+    DegradedModeMiddleware,
+    HandlerSpanMiddleware,
+    LoggingContextMiddleware,
+    ProfilingMiddleware,
+    SessionDepMiddleware,
+    SpanMiddleware,
+    TextsDepMiddleware,
+    ThrottlingMiddleware,
+    TracingMiddleware,
+)
+from src.repository import BaseRepository
+from src.tasks import flush_user_activity, reconcile_user_stats
+from src.utils.activity import ActivityTracker
+from src.utils.admission import AdmissionController, PriorityLimit
+from src.utils.bot_keys import BotKeyBuilder, bot_key_prefix
+from src.utils.catch_up import BacklogCatchUp
+from src.utils.enum import ThrottlingBackendEnum, TracingExporterEnum
+from src.utils.json_codec import get_json_codec
 from src.utils.logger import configure_logging
+from src.utils.periodic import PeriodicTask
+from src.utils.profiler import UpdateProfiler
+from src.utils.rate_limit import AbstractRateLimiter, RedisSlidingWindowRateLimiter, TokenBucketRateLimiter
+from src.utils.texts import load_json_text
+from src.utils.tracing import (
+    AbstractSpanExporter,
+    FileSpanExporter,
+    OtlpJsonSpanExporter,
+    Tracer,
+    TracingRedis,
+    TracingRedisStorage,
+    TracingRequestMiddleware,
+    instrument_engine,
+)
+from src.utils.updates import register_before_builtins, registered_commands
 
 log = logging.getLogger(__name__)
 
+periodic_tasks: list[PeriodicTask] = []
 
-async def on_shutdown(bot: Bot) -> None:
+
+def build_rate_limiter(redis: Redis) -> AbstractRateLimiter:
+    if settings.throttling.backend == ThrottlingBackendEnum.REDIS:
+        return RedisSlidingWindowRateLimiter(redis=redis)
+    return TokenBucketRateLimiter()
+
+
+def build_tracer() -> Tracer:
+    exporter: AbstractSpanExporter
+    if settings.tracing.exporter == TracingExporterEnum.OTLP:
+        exporter = OtlpJsonSpanExporter(
+            endpoint=settings.tracing.otlp_endpoint,
+            service_name=settings.tracing.service_name,
+        )
+    else:
+        exporter = FileSpanExporter(path=settings.tracing.file_path)
+    return Tracer(
+        exporter=exporter,
+        sample_rate=settings.tracing.sample_rate,
+        max_buffered=settings.tracing.max_buffered_spans,
+    )
+
+
+async def on_startup() -> None:
+    for task in periodic_tasks:
+        task.start()
+
+
+async def catch_up_on_startup(bots: Sequence[Bot], dispatcher: Dispatcher, catch_up: BacklogCatchUp) -> None:
+    # One bot at a time, so the backlogs of many bots do not compete for the same DB pool
+    for bot in bots:
+        await catch_up.run(bot=bot, dispatcher=dispatcher)
+
+
+async def on_shutdown(bot: Bot, activity_trackers: Mapping[int, ActivityTracker] | None = None) -> None:
+    for task in periodic_tasks:
+        await task.stop()
+    for tracker in (activity_trackers or {}).values():
+        await flush_user_activity(tracker=tracker)
+    stats = BaseRepository.coalescing_stats()
+    log.info("Repository reads: %d executed, %d coalesced", stats.executed, stats.coalesced)
     await db_manager.engine.dispose()
     log.info("Shutdown complete")
 
 
 async def main(
-    bot_token: str = settings.bot.token,
+    bot_tokens: Sequence[str] = settings.bot.all_tokens,
     redis_url: str = settings.redis.url,
 ) -> None:
-    log.info("Starting Bot...")
-    bot = Bot(token=bot_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-    await bot.delete_webhook(drop_pending_updates=True)
+    log.info("Starting %d bot(s)...", len(bot_tokens))
+    codec = get_json_codec(settings.serialization.json_codec)
+    log.info("Using %s JSON codec", codec.name)
+    # Every bot shares one HTTP session (requests carry their own token), the DB engine and the Redis client.
+    # Long polling keeps one connection per bot busy, so the connection limit grows with the number of bots.
+    bot_session = AiohttpSession(
+        limit=100 + len(bot_tokens),
+        json_loads=codec.loads,
+        json_dumps=codec.dumps,
+    )
+    bots = [
+        Bot(token=token, session=bot_session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+        for token in bot_tokens
+    ]
+    # The bot of `settings.bot.token` keeps its Redis keys, only the bots added next to it get their id in them
+    primary_bot_id = bots[0].id
+    for bot in bots:
+        await bot.delete_webhook(drop_pending_updates=not settings.catch_up.enabled)
+
+    tracer = build_tracer() if settings.tracing.enabled else None
+
+    def traced(middleware: BaseMiddleware) -> BaseMiddleware:
+        return SpanMiddleware(tracer=tracer, middleware=middleware) if tracer is not None else middleware
 
-    storage: RedisStorage = RedisStorage.from_url(url=redis_url)
+    key_builder = BotKeyBuilder(primary_bot_id=primary_bot_id)
+    storage: RedisStorage
+    if tracer is not None:
+        redis = TracingRedis.from_url(url=redis_url)
+        redis.tracer = tracer
+        storage = TracingRedisStorage(
+            redis=redis,
+            tracer=tracer,
+            key_builder=key_builder,
+            json_loads=codec.loads,
+            json_dumps=codec.dumps,
+        )
+        bot_session.middleware(TracingRequestMiddleware(tracer=tracer))
+        instrument_engine(engine=db_manager.engine, tracer=tracer)
+    else:
+        storage = RedisStorage.from_url(
+            url=redis_url,
+            key_builder=key_builder,
+            json_loads=codec.loads,
+            json_dumps=codec.dumps,
+        )
 
     dp = Dispatcher(storage=storage)
+    dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
 
-    dp.include_routers(commands_router)
+    for bot in bots:
+        periodic_tasks.append(
+            PeriodicTask(
+                partial(reconcile_user_stats, bot_id=bot.id),
+                interval=settings.stats.reconcile_interval,
+                name=f"reconcile-user-stats-{bot.id}",
+            )
+        )
+
+    if tracer is not None:
+        periodic_tasks.append(PeriodicTask(tracer.flush, interval=settings.tracing.flush_interval, name="flush-spans"))
+        dp.shutdown.register(tracer.close)
+        # First of all, so the root span covers admission waits and every other middleware
+        register_before_builtins(dp, TracingMiddleware(tracer=tracer))
+
+    # Handlers receive it as the `job_queue` argument
+    dp["job_queue"] = JobQueue(redis=storage.redis, prefix=settings.jobs.prefix)
+
+    if settings.catch_up.enabled:
+        dp["catch_up"] = BacklogCatchUp(
+            redis=storage.redis,
+            batch_size=settings.catch_up.batch_size,
+            concurrency=settings.catch_up.concurrency,
+            dedup_ttl=settings.catch_up.dedup_ttl,
+            max_attempts=settings.catch_up.max_attempts,
+        )
+        dp.startup.register(catch_up_on_startup)
+
+    dp.include_routers(commands_router, admin_router)
+
+    if tracer is not None:
+        # Inner middlewares of the dispatcher also run for the handlers of every included router
+        for name, observer in dp.observers.items():
+            if name != "update":
+                observer.middleware(HandlerSpanMiddleware(tracer=tracer))
+
+    commands_router.message.middleware(traced(TextsDepMiddleware()))
+    admin_router.message.middleware(traced(TextsDepMiddleware()))
+
+    if settings.admission.enabled:
+        # Right after tracing and ahead of aiogram's own middlewares, so shed updates skip the FSM storage read,
+        # the isolation lock, throttling and everything after them
+        controller = AdmissionController(
+            max_in_flight=settings.admission.max_in_flight,
+            limits={
+                priority: PriorityLimit(share=limit.share, max_queue=limit.max_queue, max_wait=limit.max_wait)
+                for priority, limit in settings.admission.priorities.items()
+            },
+        )
+        dp["admission"] = controller
+        periodic_tasks.append(
+            PeriodicTask(controller.log_snapshot, interval=settings.admission.report_interval, name="admission-report")
+        )
+        register_before_builtins(
+            dp,
+            traced(
+                AdmissionMiddleware(
+                    controller=controller,
+                    update_types=settings.admission.update_types,
+                    commands=settings.admission.commands,
+                    default=settings.admission.default,
+                )
+            ),
+        )
+
+    dp.update.outer_middleware.register(traced(LoggingContextMiddleware()))
+
+    if settings.throttling.enabled:
+        # Ahead of aiogram's FSM context middleware, so throttled updates never touch the storage or a DB session
+        limiter = build_rate_limiter(redis=storage.redis)
+        register_before_builtins(
+            dp,
+            traced(
+                ThrottlingMiddleware(
+                    limiter=limiter,
+                    default=settings.throttling.default,
+                    commands=settings.throttling.commands,
+                    max_delay=settings.throttling.max_delay,
+                    primary_bot_id=primary_bot_id,
+                )
+            ),
+        )
+        for router in (commands_router,):
+            if limit := settings.throttling.routers.get(router.name):
+                router.message.outer_middleware.register(
+                    traced(
+                        ThrottlingMiddleware(
+                            limiter=limiter,
+                            default=limit,
+                            scope=router.name,
+                            max_delay=settings.throttling.max_delay,
+                            primary_bot_id=primary_bot_id,
+                        )
+                    )
+                )
+
+    if settings.profiling.enabled:
+        profiler = UpdateProfiler(
+            output_dir=settings.profiling.output_dir,
+            sample_every=settings.profiling.sample_every,
+            flush_every=settings.profiling.flush_every,
+        )
+        dp["profiler"] = profiler
+        dp.shutdown.register(profiler.flush)
+        dp.update.outer_middleware.register(
+            traced(ProfilingMiddleware(profiler=profiler, commands=registered_commands(dp)))
+        )
+
+    if settings.activity.enabled:
+        trackers = {
+            bot.id: ActivityTracker(
+                redis=storage.redis,
+                key_prefix=bot_key_prefix(settings.activity.key_prefix, bot.id, primary_bot_id),
+                retention_days=settings.activity.retention_days,
+                bot_id=bot.id,
+            )
+            for bot in bots
+        }
+        dp["activity_trackers"] = trackers
+        for bot_id, tracker in trackers.items():
+            periodic_tasks.append(
+                PeriodicTask(
+                    partial(flush_user_activity, tracker=tracker),
+                    interval=settings.activity.flush_interval,
+                    name=f"flush-user-activity-{bot_id}",
+                )
+            )
+        dp.update.outer_middleware.register(traced(ActivityMiddleware(trackers=trackers)))
 
-    commands_router.message.middleware(TextsDepMiddleware())
+    if db_manager.circuit_breaker is not None:
+        # Right before the session middleware, so statements refused by the open circuit are answered here
+        dp.update.outer_middleware.register(
+            traced(DegradedModeMiddleware(breaker=db_manager.circuit_breaker, texts=await load_json_text()))
+        )
 
-    dp.update.outer_middleware.register(SessionDepMiddleware())
+    dp.update.outer_middleware.register(traced(SessionDepMiddleware()))
 
-    await dp.start_polling(bot)
+    await dp.start_polling(*bots)
 
 
 if __name__ == "__main__":
@@ -50,8 +50,11 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
     )
 
+    context.execute(f"SET lock_timeout = '{settings.migrations.lock_timeout}'")
+    context.execute(f"SET statement_timeout = '{settings.migrations.statement_timeout}'")
     with context.begin_transaction():
         context.run_migrations()
 
@@ -61,6 +64,8 @@ def do_run_migrations(connection: Connection) -> None:
         connection=connection,
         target_metadata=target_metadata,
         compare_server_default=True,
+        # Short per-file transactions, required by the autocommit blocks in `migrations.utils`
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -77,6 +82,12 @@ async def run_async_migrations() -> None:
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        connect_args={
+            "server_settings": {
+                "lock_timeout": settings.migrations.lock_timeout,
+                "statement_timeout": settings.migrations.statement_timeout,
+            },
+        },
     )
 
     async with connectable.connect() as connection:
@@ -0,0 +1,187 @@
+"""Helpers for migrations that must not lock hot tables for long.
+
+Every migration runs in its own transaction with `lock_timeout` and `statement_timeout` set in `env.py`,
+so a DDL statement that cannot get its lock quickly fails instead of queueing the bot's queries behind it.
+Work that takes longer than that belongs in these helpers::
+
+    def upgrade() -> None:
+        op.add_column("users", sa.Column("language", sa.String(8), nullable=True))
+        backfill("users_language", table="users", set_="language = 'en'", where="language IS NULL")
+        create_index_concurrently("ix_users_language", "users", ["language"])
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from alembic import context, op
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from sqlalchemy import ColumnElement, Connection
+
+# A child of the `alembic` logger so progress shows up with alembic's own output
+log = logging.getLogger("alembic.migrations.utils")
+
+PROGRESS_TABLE = "migration_backfill_progress"
+# lock_not_available and query_canceled (statement_timeout)
+RETRYABLE_SQLSTATES = frozenset({"55P03", "57014"})
+
+
+def _index_is_invalid(connection: Connection, index_name: str) -> bool:
+    stmt = text(
+        """
+        SELECT NOT pg_index.indisvalid
+        FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+        WHERE pg_class.relname = :index_name
+        """
+    )
+    return bool(connection.execute(stmt, {"index_name": index_name}).scalar())
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    postgresql_where: ColumnElement[bool] | str | None = None,
+) -> None:
+    """`CREATE INDEX CONCURRENTLY` outside of the migration transaction, safe to rerun after a failure."""
+    where = text(postgresql_where) if isinstance(postgresql_where, str) else postgresql_where
+    with op.get_context().autocommit_block():
+        # An interrupted concurrent build leaves an invalid index behind that IF NOT EXISTS would keep
+        if not context.is_offline_mode() and _index_is_invalid(op.get_bind(), index_name):
+            log.warning("Dropping invalid index %s left by a failed build", index_name)
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+        # The build may legitimately take longer than the statement timeout
+        op.execute("SET statement_timeout = 0")
+        try:
+            op.create_index(
+                index_name,
+                table_name,
+                list(columns),
+                unique=unique,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+                if_not_exists=True,
+            )
+        finally:
+            op.execute("RESET statement_timeout")
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def backfill(
+    name: str,
+    table: str,
+    set_: str,
+    where: str = "TRUE",
+    key: str = "id",
+    batch_size: int = settings.migrations.backfill_batch_size,
+    pause: float = settings.migrations.backfill_pause,
+    retries: int = settings.migrations.backfill_retries,
+) -> int:
+    """Run `UPDATE table SET set_ WHERE where` in keyset batches of `batch_size` rows ordered by `key`.
+
+    Every batch commits on its own together with its progress row in `migration_backfill_progress`,
+    so an interrupted backfill resumes after the last committed key instead of starting over.
+    `where` should exclude rows that are already done, which also makes reruns cheap.
+    Returns the number of rows updated by this run.
+    """
+    if context.is_offline_mode():
+        op.execute(f"UPDATE {table} SET {set_} WHERE {where}")
+        return 0
+
+    # Each batch is one statement: the progress row only advances if the batch's update commits
+    batch_stmt = text(
+        f"""
+        WITH batch AS (
+            SELECT {key} FROM {table}
+            WHERE {key} > :last_key AND ({where})
+            ORDER BY {key}
+            LIMIT :batch_size
+        ),
+        updated AS (
+            UPDATE {table} SET {set_}
+            FROM batch WHERE {table}.{key} = batch.{key}
+            RETURNING {table}.{key}
+        )
+        INSERT INTO {PROGRESS_TABLE} (name, last_key, rows_done)
+        SELECT CAST(:name AS VARCHAR), max({key}), count(*) FROM updated
+        HAVING count(*) > 0
+        ON CONFLICT (name) DO UPDATE SET
+            last_key = excluded.last_key,
+            rows_done = {PROGRESS_TABLE}.rows_done + excluded.rows_done,
+            updated_at = now()
+        RETURNING last_key, rows_done
+        """
+    )
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} (
+                    name VARCHAR(128) PRIMARY KEY,
+                    last_key BIGINT NOT NULL,
+                    rows_done BIGINT NOT NULL,
+                    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+                )
+                """
+            )
+        )
+        progress = connection.execute(
+            text(f"SELECT last_key, rows_done FROM {PROGRESS_TABLE} WHERE name = :name"),
+            {"name": name},
+        ).one_or_none()
+        last_key, rows_done = progress if progress is not None else (0, 0)
+        if progress is not None:
+            log.info("Backfill %s: resuming after %s=%d, %d rows already done", name, key, last_key, rows_done)
+        max_key = connection.execute(text(f"SELECT max({key}) FROM {table}")).scalar() or 0
+
+        started_at = time.monotonic()
+        updated = 0
+        attempt = 0
+        while True:
+            params = {"name": name, "last_key": last_key, "batch_size": batch_size}
+            try:
+                row = connection.execute(batch_stmt, params).one_or_none()
+            except DBAPIError as e:
+                if getattr(e.orig, "sqlstate", None) not in RETRYABLE_SQLSTATES or attempt >= retries:
+                    raise
+                attempt += 1
+                log.warning("Backfill %s: batch after %s=%d timed out, retry %d", name, key, last_key, attempt)
+                time.sleep(max(pause, 0.1) * 2**attempt)
+                continue
+            attempt = 0
+            if row is None:
+                break
+            updated += row.rows_done - rows_done
+            last_key, rows_done = row.last_key, row.rows_done
+            rate = updated / max(time.monotonic() - started_at, 1e-9)
+            log.info(
+                "Backfill %s: %d rows, %s=%d of %d (%.1f%%), %.0f rows/s",
+                name,
+                rows_done,
+                key,
+                last_key,
+                max_key,
+                100 * last_key / max(max_key, 1),
+                rate,
+            )
+            # Leave room for the bot's queries and for replication to catch up
+            time.sleep(pause)
+
+        connection.execute(text(f"DELETE FROM {PROGRESS_TABLE} WHERE name = :name"), {"name": name})
+    log.info("Backfill %s: done, %d rows updated", name, rows_done)
+    return updated
@@ -0,0 +1,72 @@
+"""user stats
+
+Revision ID: 7c2f4e9a1b3d
+Revises: 1d75a22bd5e5
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2f4e9a1b3d"
+down_revision: Union[str, None] = "1d75a22bd5e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_counters",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=32), nullable=False),
+        sa.Column("shard", sa.SmallInteger(), server_default="0", nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_user_counters")),
+        sa.UniqueConstraint("name", "shard", name=op.f("uq_user_counters_name_shard")),
+    )
+    # Seed the counters so they are correct before the first reconciliation runs
+    op.execute(
+        """
+        INSERT INTO user_counters (name, value)
+        SELECT 'total', count(*) FROM users
+        UNION ALL
+        SELECT 'active', count(*) FROM users WHERE is_active
+        UNION ALL
+        SELECT 'new:' || to_char(now() AT TIME ZONE 'UTC', 'YYYY-MM-DD'), count(*) FROM users
+        WHERE created_at >= date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        """
+    )
+    # `users` takes writes while the bot runs, build its indexes without blocking them.
+    # CONCURRENTLY cannot run inside a transaction, and the builds may take longer than the statement timeout
+    with op.get_context().autocommit_block():
+        op.execute("SET statement_timeout = 0")
+        try:
+            op.create_index(
+                op.f("ix_users_is_active"),
+                "users",
+                ["is_active"],
+                postgresql_where=sa.text("is_active"),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.create_index(
+                op.f("ix_users_created_at"),
+                "users",
+                ["created_at"],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        finally:
+            op.execute("RESET statement_timeout")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f("ix_users_created_at"), table_name="users", postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f("ix_users_is_active"), table_name="users", postgresql_concurrently=True, if_exists=True)
+    op.drop_table("user_counters")
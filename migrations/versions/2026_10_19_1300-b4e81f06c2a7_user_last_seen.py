@@ -0,0 +1,27 @@
+"""user last seen
+
+Revision ID: b4e81f06c2a7
+Revises: 7c2f4e9a1b3d
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e81f06c2a7"
+down_revision: Union[str, None] = "7c2f4e9a1b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "last_seen_at")
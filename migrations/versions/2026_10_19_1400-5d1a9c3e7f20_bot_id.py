@@ -0,0 +1,73 @@
+"""bot id
+
+Revision ID: 5d1a9c3e7f20
+Revises: b4e81f06c2a7
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from aiogram.utils.token import extract_bot_id
+from alembic import op
+
+from migrations.utils import backfill, create_index_concurrently, drop_index_concurrently
+from src.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "5d1a9c3e7f20"
+down_revision: Union[str, None] = "b4e81f06c2a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default does not rewrite the table
+    op.add_column("users", sa.Column("bot_id", sa.BigInteger(), server_default="0", nullable=False))
+    op.add_column("user_counters", sa.Column("bot_id", sa.BigInteger(), server_default="0", nullable=False))
+
+    # Existing rows belong to the bot this deployment has been running
+    bot_id = extract_bot_id(settings.bot.token)
+    backfill("users_bot_id", table="users", set_=f"bot_id = {bot_id}", where="bot_id = 0")
+    op.execute(f"UPDATE user_counters SET bot_id = {bot_id} WHERE bot_id = 0")
+    # The default only served the backfill; new rows must always name their bot
+    op.alter_column("users", "bot_id", server_default=None)
+    op.alter_column("user_counters", "bot_id", server_default=None)
+
+    # Build the unique indexes without blocking writes, then attach them as constraints
+    unique_constraints = {
+        "uq_users_tg_id_bot_id": ["tg_id", "bot_id"],
+        "uq_users_username_bot_id": ["username", "bot_id"],
+    }
+    for name, columns in unique_constraints.items():
+        create_index_concurrently(name, "users", columns, unique=True)
+        op.execute(f"ALTER TABLE users ADD CONSTRAINT {name} UNIQUE USING INDEX {name}")
+    op.drop_constraint("uq_users_tg_id", "users", type_="unique")
+    op.drop_constraint("uq_users_username", "users", type_="unique")
+
+    create_index_concurrently("ix_users_bot_id_created_at", "users", ["bot_id", "created_at"])
+    drop_index_concurrently("ix_users_created_at", "users")
+
+    op.drop_constraint("uq_user_counters_name_shard", "user_counters", type_="unique")
+    op.create_unique_constraint(
+        op.f("uq_user_counters_name_bot_id_shard"), "user_counters", ["name", "bot_id", "shard"]
+    )
+
+
+def downgrade() -> None:
+    # Only possible while the tables hold the data of a single bot
+    op.drop_constraint(op.f("uq_user_counters_name_bot_id_shard"), "user_counters", type_="unique")
+    op.create_unique_constraint(op.f("uq_user_counters_name_shard"), "user_counters", ["name", "shard"])
+
+    create_index_concurrently("ix_users_created_at", "users", ["created_at"])
+    drop_index_concurrently("ix_users_bot_id_created_at", "users")
+
+    op.create_unique_constraint(op.f("uq_users_tg_id"), "users", ["tg_id"])
+    op.create_unique_constraint(op.f("uq_users_username"), "users", ["username"])
+    op.drop_constraint("uq_users_tg_id_bot_id", "users", type_="unique")
+    op.drop_constraint("uq_users_username_bot_id", "users", type_="unique")
+
+    op.drop_column("user_counters", "bot_id")
+    op.drop_column("users", "bot_id")
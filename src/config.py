@@ -8,16 +8,31 @@ from pydantic import BaseModel, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy import URL
 
-from src.utils.enum import LogLevelEnum
+from src.utils.enum import (
+    JsonCodecEnum,
+    LogLevelEnum,
+    PriorityEnum,
+    ThrottlingBackendEnum,
+    TracingExporterEnum,
+)
 
 BASE_DIR: Final[Path] = Path(__file__).resolve().parent.parent
 
-LOG_DEFAULT_FORMAT: Final[str] = "[%(asctime)s.%(msecs)03d] %(module)10s:%(lineno)-3d %(levelname)-7s - %(message)s"
+LOG_DEFAULT_FORMAT: Final[str] = (
+    "[%(asctime)s.%(msecs)03d] %(module)10s:%(lineno)-3d %(levelname)-7s [%(update_id)s] - %(message)s"
+)
 LOG_DATE_FORMAT: Final[str] = "%Y-%m-%d %H:%M:%S"
 
 
 class BotConfig(BaseModel):
     token: str
+    # More bots served by the same process, dispatcher and pools; each bot's data is kept apart by its id
+    tokens: list[str] = []
+    admin_ids: list[int] = []
+
+    @property
+    def all_tokens(self) -> list[str]:
+        return list(dict.fromkeys([self.token, *self.tokens]))
 
 
 class BaseDatabaseConfig(BaseModel):
@@ -58,6 +73,11 @@ class DatabaseTestConfig(BaseDatabaseConfig):
 class DatabaseConfig(BaseDatabaseConfig):
     pool_size: int = 50
     max_overflow: int = 10
+    # Seconds an update waits for a free pooled connection before failing
+    pool_timeout: float = 5.0
+    # Server-side limit per statement, and how long asyncpg waits for any reply from the server
+    statement_timeout: str = "5s"
+    command_timeout: float = 10.0
 
 
 class RedisConfig(BaseModel):
@@ -84,12 +104,142 @@ class LoggingConfig(BaseModel):
     level: LogLevelEnum = LogLevelEnum.DEBUG
     log_format: str = LOG_DEFAULT_FORMAT
     datefmt: str = LOG_DATE_FORMAT
+    # Format and write records in a background thread instead of on the event loop
+    queue: bool = True
+    json_format: bool = False
+    # Logger name (children included) -> records per second, ERROR and above are never limited
+    rate_limits: dict[str, float] = {}
+    # Logger name (children included) -> fraction of DEBUG/INFO records to keep
+    sampling: dict[str, float] = {}
 
     @field_validator("level", mode="before")
     def validate_log_level(cls, v: Any) -> LogLevelEnum | Any:
         return v.upper() if isinstance(v, str) else v
 
 
+class StatsConfig(BaseModel):
+    reconcile_interval: float = 3600
+    keep_days: int = 31
+
+
+class CatchUpConfig(BaseModel):
+    enabled: bool = True
+    batch_size: int = 100
+    concurrency: int = 64
+    dedup_ttl: int = 86400
+    # A pending update whose handler keeps failing is dropped after this many attempts
+    max_attempts: int = 3
+
+
+class RateLimitConfig(BaseModel):
+    rate: int
+    period: float = 1.0
+
+
+class ThrottlingConfig(BaseModel):
+    enabled: bool = True
+    backend: ThrottlingBackendEnum = ThrottlingBackendEnum.MEMORY
+    # Seconds an update may be held back instead of being dropped
+    max_delay: float = 0.0
+    default: RateLimitConfig | None = RateLimitConfig(rate=5, period=1.0)
+    commands: dict[str, RateLimitConfig] = {"start": RateLimitConfig(rate=1, period=3.0)}
+    routers: dict[str, RateLimitConfig] = {}
+
+
+class JobsConfig(BaseModel):
+    prefix: str = "jobs"
+    concurrency: int = 10
+    visibility_timeout: float = 60.0
+    max_retries: int = 5
+    backoff_base: float = 2.0
+    backoff_max: float = 300.0
+    poll_interval: float = 1.0
+
+
+class TracingConfig(BaseModel):
+    enabled: bool = False
+    # Fraction of updates traced end to end, decided when the update arrives
+    sample_rate: float = 0.01
+    exporter: TracingExporterEnum = TracingExporterEnum.FILE
+    file_path: Path = BASE_DIR / "traces" / "spans.jsonl"
+    otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    service_name: str = "aiogram-base-app"
+    flush_interval: float = 5
+    max_buffered_spans: int = 10_000
+
+
+class SerializationConfig(BaseModel):
+    # Used for Bot API payloads, FSM storage data and text catalogs
+    json_codec: JsonCodecEnum = JsonCodecEnum.AUTO
+
+
+class AdmissionPriorityConfig(BaseModel):
+    # Fraction of `max_in_flight` the class may occupy, the rest is headroom for higher classes
+    share: float
+    max_queue: int
+    max_wait: float
+
+
+class AdmissionConfig(BaseModel):
+    enabled: bool = True
+    # Updates handled at once; keep it near the DB pool size (pool_size + max_overflow)
+    max_in_flight: int = 60
+    priorities: dict[PriorityEnum, AdmissionPriorityConfig] = {
+        PriorityEnum.HIGH: AdmissionPriorityConfig(share=1.0, max_queue=1000, max_wait=10.0),
+        PriorityEnum.NORMAL: AdmissionPriorityConfig(share=0.8, max_queue=500, max_wait=2.0),
+        PriorityEnum.LOW: AdmissionPriorityConfig(share=0.5, max_queue=0, max_wait=0.0),
+    }
+    # Keys are `Update.event_type` values, e.g. `message` or `callback_query`
+    update_types: dict[str, PriorityEnum] = {
+        "callback_query": PriorityEnum.HIGH,
+        "edited_message": PriorityEnum.LOW,
+        "my_chat_member": PriorityEnum.LOW,
+    }
+    commands: dict[str, PriorityEnum] = {"start": PriorityEnum.HIGH}
+    default: PriorityEnum = PriorityEnum.NORMAL
+    report_interval: float = 60
+
+
+class MigrationConfig(BaseModel):
+    # Session defaults for `alembic upgrade`; a migration that waits longer fails instead of stalling the bot
+    lock_timeout: str = "3s"
+    statement_timeout: str = "60s"
+    backfill_batch_size: int = 5000
+    backfill_pause: float = 0.1
+    backfill_retries: int = 5
+
+
+class ActivityConfig(BaseModel):
+    enabled: bool = True
+    key_prefix: str = "activity"
+    # Days of per-day unique users kept in Redis, MAU needs at least 30
+    retention_days: int = 31
+    flush_interval: float = 60
+    flush_batch_size: int = 5000
+
+
+class CircuitBreakerConfig(BaseModel):
+    enabled: bool = True
+    # Outcomes of the last `window_size` SQL statements decide whether the circuit opens
+    window_size: int = 50
+    min_calls: int = 20
+    failure_rate: float = 0.5
+    # A statement slower than this counts as a failure
+    slow_call_duration: float = 1.0
+    # Seconds of failing fast before `half_open_probes` statements are let through to test the database
+    open_duration: float = 10.0
+    half_open_probes: int = 3
+
+
+class ProfilingConfig(BaseModel):
+    # Registers the profiling middleware; while idle it costs one attribute check per update
+    enabled: bool = False
+    # Profile one update in N from startup, 0 waits for `/profile on` from an admin
+    sample_every: int = 0
+    flush_every: int = 50
+    output_dir: Path = BASE_DIR / "profiles"
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=(
@@ -106,6 +256,17 @@ class Settings(BaseSettings):
     bot: BotConfig
     redis: RedisConfig = RedisConfig()
     logging: LoggingConfig = LoggingConfig()
+    stats: StatsConfig = StatsConfig()
+    catch_up: CatchUpConfig = CatchUpConfig()
+    throttling: ThrottlingConfig = ThrottlingConfig()
+    jobs: JobsConfig = JobsConfig()
+    activity: ActivityConfig = ActivityConfig()
+    admission: AdmissionConfig = AdmissionConfig()
+    serialization: SerializationConfig = SerializationConfig()
+    tracing: TracingConfig = TracingConfig()
+    migrations: MigrationConfig = MigrationConfig()
+    circuit_breaker: CircuitBreakerConfig = CircuitBreakerConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
 
 
 settings = Settings()
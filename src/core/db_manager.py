@@ -1,31 +1,63 @@
 from __future__ import annotations
 
+import logging
 from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import URL, NullPool  # noqa
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from src.config import settings
+from src.utils.circuit_breaker import CircuitBreaker, guard_database
 
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 
 class DatabaseManager:
-    def __init__(self, url: str | URL, **engine_kwargs: Any):
+    def __init__(self, url: str | URL, circuit_breaker: CircuitBreaker | None = None, **engine_kwargs: Any):
+        # `echo=True` makes SQLAlchemy attach its own synchronous stdout handler, so SQL logging
+        # is enabled through logger levels instead and goes through the configured handlers
+        if engine_kwargs.pop("echo", False):
+            logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+        if engine_kwargs.pop("echo_pool", False):
+            logging.getLogger("sqlalchemy.pool").setLevel(logging.INFO)
         self.engine: AsyncEngine = create_async_engine(url=url, **engine_kwargs)
+        # Session events are registered on the sync factory the async sessions are built from
+        self.sync_session_factory: sessionmaker[Session] = sessionmaker()
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
+            sync_session_class=self.sync_session_factory,
             autocommit=False,
             autoflush=False,
             expire_on_commit=False,
         )
+        self.circuit_breaker = circuit_breaker
+        if circuit_breaker is not None:
+            guard_database(engine=self.engine, session_factory=self.sync_session_factory, breaker=circuit_breaker)
 
 
 db_manager = DatabaseManager(
     url=settings.db.url,
+    circuit_breaker=(
+        CircuitBreaker(
+            window_size=settings.circuit_breaker.window_size,
+            min_calls=settings.circuit_breaker.min_calls,
+            failure_rate=settings.circuit_breaker.failure_rate,
+            slow_call_duration=settings.circuit_breaker.slow_call_duration,
+            open_duration=settings.circuit_breaker.open_duration,
+            half_open_probes=settings.circuit_breaker.half_open_probes,
+        )
+        if settings.circuit_breaker.enabled
+        else None
+    ),
     echo=settings.db.echo,
     echo_pool=settings.db.echo_pool,
     pool_size=settings.db.pool_size,
     max_overflow=settings.db.max_overflow,
+    pool_timeout=settings.db.pool_timeout,
+    connect_args={
+        "command_timeout": settings.db.command_timeout,
+        "server_settings": {"statement_timeout": settings.db.statement_timeout},
+    },
 )
@@ -1,7 +1,9 @@
 from .base import BaseOrm
 from .user import UserOrm
+from .user_counter import UserCounterOrm
 
 __all__ = [
     "BaseOrm",
+    "UserCounterOrm",
     "UserOrm",
 ]
@@ -1,5 +1,7 @@
+from .bot_scoped import BotScopedMixin
 from .timestamp import TimestampMixin
 
 __all__ = [
+    "BotScopedMixin",
     "TimestampMixin",
 ]
@@ -0,0 +1,8 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class BotScopedMixin:
+    # Telegram id of the bot the row belongs to, so several bots can share the same tables.
+    # No default: a row written without a bot bound to the session is a bug, see `get_session_bot_id`
+    bot_id: Mapped[int] = mapped_column(BigInteger)
@@ -1,14 +1,26 @@
-from sqlalchemy import BigInteger, Boolean, String
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Index, String, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.core.models.base import BaseOrm
-from src.core.models.mixins import TimestampMixin
+from src.core.models.mixins import BotScopedMixin, TimestampMixin
+
 
+class UserOrm(BaseOrm, BotScopedMixin, TimestampMixin):
+    __table_args__ = (
+        # `tg_id` leads, so lookups by Telegram id alone can use it too
+        UniqueConstraint("tg_id", "bot_id"),
+        UniqueConstraint("username", "bot_id"),
+        Index("ix_users_is_active", "is_active", postgresql_where=text("is_active")),
+        Index("ix_users_bot_id_created_at", "bot_id", "created_at"),
+    )
 
-class UserOrm(BaseOrm, TimestampMixin):
-    tg_id: Mapped[int] = mapped_column(BigInteger, unique=True)
+    tg_id: Mapped[int] = mapped_column(BigInteger)
     first_name: Mapped[str] = mapped_column(String(30))
-    username: Mapped[str | None] = mapped_column(String(50), unique=True)
+    username: Mapped[str | None] = mapped_column(String(50))
     last_name: Mapped[str | None] = mapped_column(String(30))
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Flushed in batches from Redis by the activity task, so it may lag behind by one flush interval
+    last_seen_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
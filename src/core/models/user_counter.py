@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, SmallInteger, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.models.base import BaseOrm
+from src.core.models.mixins import BotScopedMixin
+
+
+class UserCounterOrm(BaseOrm, BotScopedMixin):
+    __table_args__ = (UniqueConstraint("name", "bot_id", "shard"),)
+
+    name: Mapped[str] = mapped_column(String(32))
+    # A counter is the sum of its shard rows, see `UserStatsRepository`
+    shard: Mapped[int] = mapped_column(SmallInteger, default=0, server_default="0")
+    value: Mapped[int] = mapped_column(BigInteger, default=0)
@@ -1,7 +1,13 @@
+from .converters import get_list_adapter, orm_to_schemas, rows_to_schemas
 from .user import UserCreateS, UserS, UserUpdateS
+from .user_stats import UserStatsS
 
 __all__ = [
     "UserS",
     "UserCreateS",
     "UserUpdateS",
+    "UserStatsS",
+    "get_list_adapter",
+    "orm_to_schemas",
+    "rows_to_schemas",
 ]
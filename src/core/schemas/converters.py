@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, TypeAdapter
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from sqlalchemy import Row
+
+
+@cache
+def get_list_adapter[SchemaT: BaseModel](schema: type[SchemaT]) -> TypeAdapter[list[SchemaT]]:
+    # Building a TypeAdapter compiles a validator, so it is done once per schema
+    return TypeAdapter(list[schema])  # type: ignore[valid-type]
+
+
+def orm_to_schemas[SchemaT: BaseModel](schema: type[SchemaT], instances: Iterable[Any]) -> list[SchemaT]:
+    """Validate a whole sequence of ORM instances in a single validator call."""
+    return get_list_adapter(schema).validate_python(instances, from_attributes=True)
+
+
+def rows_to_schemas[SchemaT: BaseModel](schema: type[SchemaT], rows: Sequence[Row[Any]]) -> list[SchemaT]:
+    """Validate `Row` tuples selected column by column, without building ORM instances.
+
+    Column labels must match the schema fields. Rows are zipped into plain dicts, which pydantic
+    validates noticeably faster than attribute access on `Row`.
+    """
+    if not rows:
+        return []
+    fields = rows[0]._fields
+    return get_list_adapter(schema).validate_python([dict(zip(fields, row, strict=True)) for row in rows])
@@ -1,21 +1,21 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from datetime import datetime
 
-from pydantic import BaseModel
-
-if TYPE_CHECKING:
-    from datetime import datetime
+from pydantic import BaseModel, ConfigDict
 
 
 class UserS(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     tg_id: int
     first_name: str
-    username: str
-    last_name: str
+    username: str | None
+    last_name: str | None
 
     is_active: bool
+    last_seen_at: datetime | None = None
 
     created_at: datetime
     updated_at: datetime
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class UserStatsS(BaseModel):
+    total: int
+    active: int
+    new_today: int
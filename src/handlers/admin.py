@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from aiogram import F, Router
+from aiogram.filters import Command, CommandObject
+
+from src.config import settings
+
+if TYPE_CHECKING:
+    from aiogram.types import Message
+
+    from src.utils.activity import ActivityTracker
+    from src.utils.profiler import UpdateProfiler
+
+router = Router(name="admin")
+router.message.filter(F.from_user.id.in_(settings.bot.admin_ids))
+
+
+@router.message(Command("profile"))
+async def command_profile_handler(
+    message: Message,
+    command: CommandObject,
+    texts: dict[str, Any],
+    profiler: UpdateProfiler | None = None,
+) -> None:
+    """`/profile on [sample_every] [seconds]`, `/profile off` or `/profile flush`."""
+    if profiler is None:
+        await message.reply(texts["profiling_unavailable"])
+        return
+
+    action, *params = (command.args or "").split() or [""]
+    if action == "on" and all(param.isdigit() for param in params[:2]):
+        sample_every = int(params[0]) if params else 1
+        duration = int(params[1]) if len(params) > 1 else None
+        profiler.enable(sample_every=sample_every, duration=duration)
+        await message.reply(texts["profiling_enabled"].format(sample_every=sample_every, duration=duration or "∞"))
+    elif action == "off":
+        profiler.disable()
+        await message.reply(texts["profiling_disabled"].format(output_dir=profiler.output_dir))
+    elif action == "flush":
+        paths = profiler.flush()
+        await message.reply(texts["profiling_flushed"].format(count=len(paths), output_dir=profiler.output_dir))
+    else:
+        await message.reply(texts["profiling_usage"])
+
+
+@router.message(Command("activity"))
+async def command_activity_handler(
+    message: Message,
+    texts: dict[str, Any],
+    activity_tracker: ActivityTracker | None = None,
+) -> None:
+    if activity_tracker is None:
+        await message.reply(texts["activity_unavailable"])
+        return
+
+    dau, wau, mau = [await activity_tracker.unique_users(days=days) for days in (1, 7, 30)]
+    await message.reply(texts["activity"].format(dau=dau, wau=wau, mau=mau))
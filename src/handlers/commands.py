@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, Any
 
 from aiogram import Router
 from aiogram.filters import CommandStart
+from sqlalchemy.exc import IntegrityError
 
 from src.core.schemas import UserCreateS
 from src.repository.user import UserRepository
@@ -12,14 +13,14 @@ if TYPE_CHECKING:
     from aiogram.types import Message
     from sqlalchemy.ext.asyncio import AsyncSession
 
-router = Router()
+router = Router(name="commands")
 
 
 @router.message(CommandStart())
 async def command_start_handler(message: Message, session: AsyncSession, texts: dict[str, Any]) -> None:
     if message.from_user is None:
         return
-    if await UserRepository.get_by_tg_id(session=session, tg_id=message.from_user.id):
+    if await UserRepository.exists_by_tg_id(session=session, tg_id=message.from_user.id):
         await message.reply(texts["already_registered"])
         return
     create_schema = UserCreateS(
@@ -28,8 +29,14 @@ async def command_start_handler(message: Message, session: AsyncSession, texts:
         first_name=message.from_user.first_name,
         last_name=message.from_user.last_name,
     )
-    await UserRepository.create(
-        session=session,
-        create_schema=create_schema,
-    )
+    try:
+        # A savepoint keeps the update's transaction usable if a concurrent /start registered the user first
+        async with session.begin_nested():
+            await UserRepository.create(
+                session=session,
+                create_schema=create_schema,
+            )
+    except IntegrityError:
+        await message.reply(texts["already_registered"])
+        return
     await message.reply(texts["welcome"].format(fullname=message.from_user.full_name))
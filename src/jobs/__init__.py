@@ -0,0 +1,13 @@
+from .base import JOB_REGISTRY, BaseJob, JobContext
+from .notifications import SendMessageJob
+from .queue import JobQueue
+from .worker import Worker
+
+__all__ = [
+    "JOB_REGISTRY",
+    "BaseJob",
+    "JobContext",
+    "JobQueue",
+    "SendMessageJob",
+    "Worker",
+]
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from pydantic import BaseModel
+
+from src.utils.case_converter import camel_case_to_snake_case
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+log = logging.getLogger(__name__)
+
+JOB_REGISTRY: dict[str, type[BaseJob]] = {}
+
+
+@dataclass(slots=True)
+class JobContext:
+    session: AsyncSession
+    bot: Bot
+    attempt: int
+
+
+class BaseJob(BaseModel, ABC):
+    """A typed unit of background work. Fields are the payload, `run` does the work in the worker."""
+
+    job_name: ClassVar[str]
+    # `None` falls back to `settings.jobs.max_retries`
+    max_retries: ClassVar[int | None] = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.job_name = camel_case_to_snake_case(cls.__name__)
+        if cls.job_name in JOB_REGISTRY:
+            msg = "Job %s is already registered by %s" % (cls.job_name, JOB_REGISTRY[cls.job_name].__name__)
+            log.error(msg)
+            raise ValueError(msg)
+        JOB_REGISTRY[cls.job_name] = cls
+
+    @abstractmethod
+    async def run(self, context: JobContext) -> None:
+        raise NotImplementedError()
+
+
+class JobEnvelope(BaseModel):
+    id: str
+    name: str
+    # Telegram id of the bot the job runs as; its session is scoped to that bot's data
+    bot_id: int
+    payload: dict[str, Any]
+    enqueued_at: float
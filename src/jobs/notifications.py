@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from src.jobs.base import BaseJob
+
+if TYPE_CHECKING:
+    from src.jobs.base import JobContext
+
+
+class SendMessageJob(BaseJob):
+    chat_id: int
+    text: str
+
+    async def run(self, context: JobContext) -> None:
+        await context.bot.send_message(chat_id=self.chat_id, text=self.text)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import time
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final
+
+from src.jobs.base import JobEnvelope
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+    from src.jobs.base import BaseJob
+
+# KEYS: ready, delayed, in_flight, data, attempts; ARGV: visibility timeout in ms
+RESERVE_SCRIPT: Final[str] = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+for _, source in ipairs({KEYS[2], KEYS[3]}) do
+    local due = redis.call('ZRANGEBYSCORE', source, '-inf', now, 'LIMIT', 0, 100)
+    for _, id in ipairs(due) do
+        redis.call('ZREM', source, id)
+        redis.call('RPUSH', KEYS[1], id)
+    end
+end
+
+local id = redis.call('LPOP', KEYS[1])
+if not id then
+    return false
+end
+redis.call('ZADD', KEYS[3], now + tonumber(ARGV[1]), id)
+local attempt = redis.call('HINCRBY', KEYS[5], id, 1)
+return {id, redis.call('HGET', KEYS[4], id), attempt}
+"""
+
+# KEYS: in_flight; ARGV: job id, visibility timeout in ms
+TOUCH_SCRIPT: Final[str] = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+return redis.call('ZADD', KEYS[1], 'XX', 'CH', now + tonumber(ARGV[2]), ARGV[1])
+"""
+
+
+@dataclass(slots=True)
+class ReservedJob:
+    envelope: JobEnvelope
+    attempt: int
+
+
+class JobQueue:
+    """Reliable Redis job queue.
+
+    Reserved jobs move to an in-flight sorted set scored by their visibility deadline. A job that is
+    neither acknowledged nor touched before the deadline (e.g. its worker died) becomes ready again.
+    """
+
+    def __init__(self, redis: Redis, prefix: str = "jobs") -> None:
+        self.redis = redis
+        self.ready_key = f"{prefix}:ready"
+        self.delayed_key = f"{prefix}:delayed"
+        self.in_flight_key = f"{prefix}:in_flight"
+        self.data_key = f"{prefix}:data"
+        self.attempts_key = f"{prefix}:attempts"
+        self.dead_key = f"{prefix}:dead"
+        self._reserve = redis.register_script(RESERVE_SCRIPT)
+        self._touch = redis.register_script(TOUCH_SCRIPT)
+
+    async def enqueue(self, job: BaseJob, bot_id: int, delay: float = 0.0) -> str:
+        envelope = JobEnvelope(
+            id=uuid.uuid4().hex,
+            name=job.job_name,
+            bot_id=bot_id,
+            payload=job.model_dump(mode="json"),
+            enqueued_at=time.time(),
+        )
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.data_key, envelope.id, envelope.model_dump_json())
+            if delay > 0:
+                pipe.zadd(self.delayed_key, {envelope.id: int((time.time() + delay) * 1000)})
+            else:
+                pipe.rpush(self.ready_key, envelope.id)
+            await pipe.execute()
+        return envelope.id
+
+    async def reserve(self, visibility_timeout: float) -> ReservedJob | None:
+        reserved = await self._reserve(
+            keys=[self.ready_key, self.delayed_key, self.in_flight_key, self.data_key, self.attempts_key],
+            args=[int(visibility_timeout * 1000)],
+        )
+        if not reserved:
+            return None
+        job_id, raw_envelope, attempt = reserved
+        if raw_envelope is None:
+            await self.ack(job_id)
+            return None
+        return ReservedJob(envelope=JobEnvelope.model_validate_json(raw_envelope), attempt=int(attempt))
+
+    async def touch(self, job_id: str, visibility_timeout: float) -> bool:
+        return bool(await self._touch(keys=[self.in_flight_key], args=[job_id, int(visibility_timeout * 1000)]))
+
+    async def ack(self, job_id: str) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.in_flight_key, job_id)
+            pipe.hdel(self.data_key, job_id)
+            pipe.hdel(self.attempts_key, job_id)
+            await pipe.execute()
+
+    async def retry(self, job_id: str, delay: float) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.in_flight_key, job_id)
+            pipe.zadd(self.delayed_key, {job_id: int((time.time() + delay) * 1000)})
+            await pipe.execute()
+
+    async def bury(self, job_id: str) -> None:
+        # The payload stays in the data hash so dead jobs can be inspected and re-enqueued
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.in_flight_key, job_id)
+            pipe.hdel(self.attempts_key, job_id)
+            pipe.rpush(self.dead_key, job_id)
+            await pipe.execute()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from src.jobs.base import JOB_REGISTRY, JobContext
+from src.repository.base import bot_session_info
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from aiogram import Bot
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from src.jobs.queue import JobQueue, ReservedJob
+
+log = logging.getLogger(__name__)
+
+
+class Worker:
+    def __init__(
+        self,
+        queue: JobQueue,
+        session_factory: async_sessionmaker[AsyncSession],
+        bots: Sequence[Bot],
+        concurrency: int = 10,
+        visibility_timeout: float = 60.0,
+        max_retries: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 300.0,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.queue = queue
+        self.session_factory = session_factory
+        self.bots = {bot.id: bot for bot in bots}
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        log.info("Worker started with concurrency %d, jobs: %s", self.concurrency, ", ".join(sorted(JOB_REGISTRY)))
+        await asyncio.gather(*(self._consume() for _ in range(self.concurrency)))
+        log.info("Worker stopped")
+
+    async def _consume(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                reserved = await self.queue.reserve(visibility_timeout=self.visibility_timeout)
+            except Exception:
+                log.exception("Failed to reserve a job")
+                reserved = None
+            if reserved is None:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                continue
+            await self._execute(reserved)
+
+    async def _execute(self, reserved: ReservedJob) -> None:
+        envelope = reserved.envelope
+        job_cls = JOB_REGISTRY.get(envelope.name)
+        if job_cls is None:
+            log.error("Unknown job %s id=%s, moving it to the dead queue", envelope.name, envelope.id)
+            await self.queue.bury(envelope.id)
+            return
+        bot = self.bots.get(envelope.bot_id)
+        if bot is None:
+            log.error(
+                "Job %s id=%s is for unknown bot %d, moving it to the dead queue",
+                envelope.name,
+                envelope.id,
+                envelope.bot_id,
+            )
+            await self.queue.bury(envelope.id)
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(envelope.id))
+        try:
+            job = job_cls.model_validate(envelope.payload)
+            async with self.session_factory(info=bot_session_info(bot.id)) as session, session.begin():
+                await job.run(JobContext(session=session, bot=bot, attempt=reserved.attempt))
+        except Exception:
+            max_retries = self.max_retries if job_cls.max_retries is None else job_cls.max_retries
+            if reserved.attempt > max_retries:
+                log.exception(
+                    "Job %s id=%s failed for good after %d attempts", envelope.name, envelope.id, reserved.attempt
+                )
+                await self.queue.bury(envelope.id)
+                return
+            delay = self._backoff(reserved.attempt)
+            log.warning(
+                "Job %s id=%s failed on attempt %d, retrying in %.1fs",
+                envelope.name,
+                envelope.id,
+                reserved.attempt,
+                delay,
+                exc_info=True,
+            )
+            await self.queue.retry(envelope.id, delay=delay)
+        else:
+            await self.queue.ack(envelope.id)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        # Keep extending the visibility deadline while the job is still running
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await self.queue.touch(job_id, visibility_timeout=self.visibility_timeout)
+            except Exception:
+                log.exception("Failed to extend visibility of job id=%s", job_id)
+
+    def _backoff(self, attempt: int) -> float:
+        delay: float = min(self.backoff_max, self.backoff_base**attempt)
+        return delay * random.uniform(0.5, 1.0)
@@ -1,4 +1,23 @@
+from .activity import ActivityMiddleware
+from .admission import AdmissionMiddleware
+from .degraded_mode import DegradedModeMiddleware
+from .logging_context import LoggingContextMiddleware
+from .profiling import ProfilingMiddleware
 from .session_dep import SessionDepMiddleware
 from .texts_dep import TextsDepMiddleware
+from .throttling import ThrottlingMiddleware
+from .tracing import HandlerSpanMiddleware, SpanMiddleware, TracingMiddleware
 
-__all__ = ["SessionDepMiddleware", "TextsDepMiddleware"]
+__all__ = [
+    "ActivityMiddleware",
+    "AdmissionMiddleware",
+    "DegradedModeMiddleware",
+    "HandlerSpanMiddleware",
+    "LoggingContextMiddleware",
+    "ProfilingMiddleware",
+    "SessionDepMiddleware",
+    "SpanMiddleware",
+    "TextsDepMiddleware",
+    "ThrottlingMiddleware",
+    "TracingMiddleware",
+]
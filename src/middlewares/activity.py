@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiogram import BaseMiddleware
+from redis.exceptions import RedisError
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Mapping
+
+    from aiogram import Bot
+    from aiogram.types import TelegramObject, User
+
+    from src.utils.activity import ActivityTracker
+
+log = logging.getLogger(__name__)
+
+
+class ActivityMiddleware(BaseMiddleware):
+    """Record that the user was active, costing one Redis round trip and no SQL per update.
+
+    `trackers` maps bot ids to their trackers; the tracker of the current bot is passed to handlers
+    as `activity_tracker`.
+    """
+
+    def __init__(self, trackers: Mapping[int, ActivityTracker]) -> None:
+        self.trackers = trackers
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        bot: Bot | None = data.get("bot")
+        tracker = self.trackers.get(bot.id) if bot is not None else None
+        if tracker is None:
+            return await handler(event, data)
+        data["activity_tracker"] = tracker
+
+        user: User | None = data.get("event_from_user")
+        if user is not None and not user.is_bot:
+            try:
+                await tracker.touch(user.id)
+            except RedisError:
+                # Activity is best effort and must not cost the user a reply
+                log.warning("Failed to record activity of user %d", user.id, exc_info=True)
+        return await handler(event, data)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from src.utils.catch_up import CATCH_UP_DATA_KEY
+from src.utils.enum import PriorityEnum
+from src.utils.updates import extract_command
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Mapping
+
+    from aiogram.types import TelegramObject
+
+    from src.utils.admission import AdmissionController
+
+log = logging.getLogger(__name__)
+
+
+class AdmissionMiddleware(BaseMiddleware):
+    """Admit updates into the bounded in-flight budget by priority, dropping the ones that are shed.
+
+    Registered with `register_before_builtins` right after tracing, ahead of aiogram's errors, user and FSM context
+    middlewares, so shed updates cost nothing but the classification: no storage read and no isolation lock.
+    Updates replayed by the startup catch-up bypass it: they are already limited by the catch-up concurrency
+    and shedding them would silently lose the backlog.
+    """
+
+    def __init__(
+        self,
+        controller: AdmissionController,
+        update_types: Mapping[str, PriorityEnum] | None = None,
+        commands: Mapping[str, PriorityEnum] | None = None,
+        default: PriorityEnum = PriorityEnum.NORMAL,
+    ) -> None:
+        self.controller = controller
+        self.update_types = update_types or {}
+        self.commands = commands or {}
+        self.default = default
+
+    def classify(self, event: TelegramObject) -> PriorityEnum:
+        command = extract_command(event) if self.commands else None
+        if command is not None and command in self.commands:
+            return self.commands[command]
+        if isinstance(event, Update):
+            return self.update_types.get(event.event_type, self.default)
+        return self.default
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if data.get(CATCH_UP_DATA_KEY):
+            return await handler(event, data)
+        priority = self.classify(event)
+        if not await self.controller.acquire(priority):
+            log.debug("Shed %s priority update", priority)
+            return None
+        try:
+            return await handler(event, data)
+        finally:
+            self.controller.release()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, Update
+
+from src.utils.circuit_breaker import CircuitOpenError
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Mapping
+
+    from aiogram.types import TelegramObject
+
+    from src.utils.circuit_breaker import CircuitBreaker
+
+log = logging.getLogger(__name__)
+
+
+class DegradedModeMiddleware(BaseMiddleware):
+    """Answer "try later" to updates whose handlers needed the database while its circuit was open.
+
+    Register it as a `dp.update` outer middleware ahead of the session one.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, texts: Mapping[str, Any]) -> None:
+        self.breaker = breaker
+        self.try_later_text: str = texts["try_later"]
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        try:
+            return await handler(event, data)
+        except CircuitOpenError:
+            log.debug("Database circuit is open, update is answered with a retry hint")
+            target = event.event if isinstance(event, Update) else event
+            if isinstance(target, Message | CallbackQuery):
+                await target.answer(self.try_later_text)
+            return None
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from src.utils.logger import update_id_var
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+    from aiogram.types import TelegramObject
+
+
+class LoggingContextMiddleware(BaseMiddleware):
+    """Expose the update id to every log record emitted while the update is handled."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+        token = update_id_var.set(event.update_id)
+        try:
+            return await handler(event, data)
+        finally:
+            update_id_var.reset(token)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from src.utils.updates import extract_command
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Collection
+
+    from aiogram.types import TelegramObject
+
+    from src.utils.profiler import UpdateProfiler
+
+
+# Stands for every command no handler is registered for, so user input cannot create new keys
+OTHER_COMMAND = "<other>"
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """Profile sampled updates, keyed by update type and, for messages, by one of the `commands`."""
+
+    def __init__(self, profiler: UpdateProfiler, commands: Collection[str] = ()) -> None:
+        self.profiler = profiler
+        self.commands = frozenset(commands)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not self.profiler.active or not self.profiler.should_sample():
+            return await handler(event, data)
+
+        key = event.event_type if isinstance(event, Update) else type(event).__name__
+        if command := extract_command(event):
+            key = f"{key}.{command if command in self.commands else OTHER_COMMAND}"
+        return await self.profiler.profile(key, lambda: handler(event, data))
@@ -5,10 +5,12 @@ from typing import TYPE_CHECKING, Any, Callable
 from aiogram import BaseMiddleware
 
 from src.core import db_manager
+from src.repository.base import bot_session_info
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable
 
+    from aiogram import Bot
     from aiogram.types import TelegramObject
     from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
@@ -26,6 +28,11 @@ class SessionDepMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        async with self.session_factory() as session:
+        # One transaction per update: committed once after the handler returns, rolled back if it raises.
+        # Nested work that may fail on its own should use `session.begin_nested()` (a savepoint).
+        # Repositories keep the data of each bot apart using the bot id stored in `session.info`.
+        bot: Bot | None = data.get("bot")
+        info = bot_session_info(bot.id if bot is not None else None)
+        async with self.session_factory(info=info) as session, session.begin():
             data["session"] = session
             return await handler(event, data)
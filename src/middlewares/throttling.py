@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.middlewares.user_context import EVENT_FROM_USER_KEY, UserContextMiddleware
+from aiogram.types import Update
+
+from src.utils.bot_keys import bot_key_prefix
+from src.utils.updates import extract_command
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Mapping
+
+    from aiogram import Bot
+    from aiogram.types import TelegramObject, User
+
+    from src.config import RateLimitConfig
+    from src.utils.rate_limit import AbstractRateLimiter
+
+log = logging.getLogger(__name__)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Drop (or briefly delay) updates from users that exceed their rate limit.
+
+    Registered with `register_before_builtins` it runs before aiogram's FSM context middleware, so a throttled update
+    costs neither a storage read nor the isolation lock, let alone a DB session. It can also be registered as a router
+    outer middleware for per-router limits.
+    With `primary_bot_id` every other bot served by the process has its limits counted under its own keys,
+    while the primary bot keeps the keys it had on its own.
+    """
+
+    def __init__(
+        self,
+        limiter: AbstractRateLimiter,
+        default: RateLimitConfig | None = None,
+        commands: Mapping[str, RateLimitConfig] | None = None,
+        scope: str = "global",
+        max_delay: float = 0.0,
+        primary_bot_id: int | None = None,
+    ) -> None:
+        self.limiter = limiter
+        self.default = default
+        self.commands = commands or {}
+        self.scope = scope
+        self.max_delay = max_delay
+        self.primary_bot_id = primary_bot_id
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user: User | None = data.get(EVENT_FROM_USER_KEY)
+        if user is None and isinstance(event, Update):
+            # Ahead of aiogram's user context middleware
+            user = UserContextMiddleware.resolve_event_context(event).user
+        if user is None:
+            return await handler(event, data)
+
+        command = extract_command(event) if self.commands else None
+        if command is not None and command in self.commands:
+            name, limit = command, self.commands[command]
+        elif self.default is not None:
+            name, limit = "default", self.default
+        else:
+            return await handler(event, data)
+
+        bot: Bot | None = data.get("bot")
+        scope = self.scope if bot is None else bot_key_prefix(self.scope, bot.id, self.primary_bot_id)
+        key = f"{scope}:{name}:{user.id}"
+        wait = await self.limiter.hit(key, limit.rate, limit.period)
+        if wait and wait <= self.max_delay:
+            await asyncio.sleep(wait)
+            wait = await self.limiter.hit(key, limit.rate, limit.period)
+        if wait:
+            log.debug("Throttled user id=%d on %s (retry in %.2fs)", user.id, key, wait)
+            return None
+        return await handler(event, data)
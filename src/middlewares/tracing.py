@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+    from aiogram.dispatcher.event.handler import HandlerObject
+    from aiogram.types import TelegramObject
+
+    from src.utils.tracing import Tracer
+
+
+class TracingMiddleware(BaseMiddleware):
+    """Open the root span of a sampled update; register it first, with `register_before_builtins`."""
+
+    def __init__(self, tracer: Tracer) -> None:
+        self.tracer = tracer
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+        with self.tracer.trace("update", update_id=event.update_id, event_type=event.event_type):
+            return await handler(event, data)
+
+
+class SpanMiddleware(BaseMiddleware):
+    """Wrap another middleware in a span named after its class."""
+
+    def __init__(self, tracer: Tracer, middleware: BaseMiddleware) -> None:
+        self.tracer = tracer
+        self.middleware = middleware
+        self.span_name = f"middleware.{type(middleware).__name__}"
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        with self.tracer.span(self.span_name):
+            return await self.middleware(handler, event, data)
+
+
+class HandlerSpanMiddleware(BaseMiddleware):
+    """Inner middleware naming the span after the handler callback that was matched."""
+
+    def __init__(self, tracer: Tracer) -> None:
+        self.tracer = tracer
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        handler_object: HandlerObject | None = data.get("handler")
+        name = getattr(handler_object.callback, "__qualname__", "handler") if handler_object else "handler"
+        with self.tracer.span(f"handler.{name}"):
+            return await handler(event, data)
@@ -1,9 +1,11 @@
 from .abstract import AbstractRepository
 from .base import BaseRepository
 from .user import UserRepository
+from .user_stats import UserStatsRepository
 
 __all__ = [
     "AbstractRepository",
     "BaseRepository",
     "UserRepository",
+    "UserStatsRepository",
 ]
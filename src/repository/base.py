@@ -3,21 +3,60 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from src.core.models import BaseOrm
 from src.repository import AbstractRepository
+from src.utils.singleflight import SingleFlight
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Awaitable, Callable, Hashable, Mapping, Sequence
 
     from pydantic import BaseModel
-    from sqlalchemy import Result, ScalarResult
+    from sqlalchemy import Result, Row, ScalarResult
     from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import ORMExecuteState, UOWTransaction
+
+    from src.utils.singleflight import SingleFlightStats
 
 
 log = logging.getLogger(__name__)
 
+SESSION_WRITES_KEY = "repository_writes"
+# Set by `SessionDepMiddleware` to the id of the bot that received the update
+SESSION_BOT_ID_KEY = "bot_id"
+
+# Shared by every repository so concurrent updates asking for the same row hit Postgres once
+read_coalescer = SingleFlight()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_writes(session: Session, flush_context: UOWTransaction) -> None:
+    session.info[SESSION_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_executed_writes(orm_execute_state: ORMExecuteState) -> None:
+    # Anything that is not a SELECT (DML, textual SQL) may have written rows
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[SESSION_WRITES_KEY] = True
+
+
+def bot_session_info(bot_id: int | None) -> dict[str, Any]:
+    """`info` for a new session whose repository calls are scoped to `bot_id`."""
+    return {SESSION_BOT_ID_KEY: bot_id} if bot_id is not None else {}
+
+
+def get_session_bot_id(session: AsyncSession) -> int:
+    """Id of the bot the session is scoped to; open the session with `bot_session_info` to bind one."""
+    bot_id: int | None = session.info.get(SESSION_BOT_ID_KEY)
+    if bot_id is None:
+        msg = "Session is not bound to a bot, open it with `info=bot_session_info(bot_id)`"
+        log.error(msg)
+        raise RuntimeError(msg)
+    return bot_id
+
 
 class BaseRepository[ModelT: BaseOrm, CreateST: BaseModel, UpdateST: BaseModel](
     AbstractRepository[ModelT, CreateST, UpdateST]
@@ -34,38 +73,144 @@ class BaseRepository[ModelT: BaseOrm, CreateST: BaseModel, UpdateST: BaseModel](
             log.error(msg)
             raise ValueError(msg)
 
+    @staticmethod
+    def coalescing_stats() -> SingleFlightStats:
+        return read_coalescer.stats
+
+    @staticmethod
+    def _has_writes(session: AsyncSession) -> bool:
+        """Whether the session changed anything it must read back, set by the session events above."""
+        return bool(session.info.get(SESSION_WRITES_KEY) or session.new or session.dirty or session.deleted)
+
+    @classmethod
+    def _scoped(cls, session: AsyncSession, values: Mapping[str, Any]) -> dict[str, Any]:
+        """`values` limited to the session's bot when the model has a `bot_id` column."""
+        if "bot_id" not in cls.model_class.__table__.columns:
+            return dict(values)
+        return {"bot_id": get_session_bot_id(session), **values}
+
+    @classmethod
+    async def _coalesce[ResultT](
+        cls,
+        session: AsyncSession,
+        key: Hashable,
+        query: Callable[[], Awaitable[ResultT]],
+    ) -> ResultT:
+        """Share `query` with concurrent identical reads, unless the session must see its own writes."""
+        if cls._has_writes(session):
+            return await query()
+        return await read_coalescer.do((id(session.bind), cls.model_class.__tablename__, key), query)
+
     @classmethod
     async def create(cls, session: AsyncSession, create_schema: CreateST) -> None:
         # fmt: off
         stmt = (
             insert(cls.model_class)
-            .values(**create_schema.model_dump())
+            .values(**cls._scoped(session, create_schema.model_dump()))
         )
         # fmt: on
         await session.execute(stmt)
-        await session.commit()
 
     @classmethod
     async def _get_by_fields(cls, session: AsyncSession, **filter_by: Any) -> ScalarResult[ModelT]:
         # fmt: off
         stmt = (
             select(cls.model_class).
-            filter_by(**filter_by)
+            filter_by(**cls._scoped(session, filter_by))
         )
         # fmt: on
         result: Result[tuple[ModelT, ...]] = await session.execute(stmt)
         scalar_result: ScalarResult[ModelT] = result.scalars()
         return scalar_result
 
+    @classmethod
+    async def _get_one_by_fields(cls, session: AsyncSession, **filter_by: Any) -> ModelT | None:
+        filter_by = cls._scoped(session, filter_by)
+        if cls._has_writes(session):
+            scalar_result: ScalarResult[ModelT] = await cls._get_by_fields(session=session, **filter_by)
+            return scalar_result.one_or_none()
+
+        async def query() -> Row[Any] | None:
+            stmt = select(*cls.model_class.__table__.columns).filter_by(**filter_by)
+            return (await session.execute(stmt)).one_or_none()
+
+        # Waiters share plain column values; each session then builds its own ORM instance
+        row = await cls._coalesce(session, ("one", *sorted(filter_by.items())), query)
+        if row is None:
+            return None
+        instance = cls.model_class(**row._mapping)
+        make_transient_to_detached(instance)
+        return await session.merge(instance, load=False)
+
+    @classmethod
+    async def exists_by(cls, session: AsyncSession, **filter_by: Any) -> bool:
+        filter_by = cls._scoped(session, filter_by)
+        # fmt: off
+        stmt = select(
+            select(cls.model_class.id)
+            .filter_by(**filter_by)
+            .exists()
+        )
+        # fmt: on
+
+        async def query() -> bool:
+            exists: bool = (await session.execute(stmt)).scalar_one()
+            return exists
+
+        return await cls._coalesce(session, ("exists", *sorted(filter_by.items())), query)
+
+    @classmethod
+    async def count_by(cls, session: AsyncSession, **filter_by: Any) -> int:
+        filter_by = cls._scoped(session, filter_by)
+        # fmt: off
+        stmt = (
+            select(func.count())
+            .select_from(cls.model_class)
+            .filter_by(**filter_by)
+        )
+        # fmt: on
+
+        async def query() -> int:
+            count: int = (await session.execute(stmt)).scalar_one()
+            return count
+
+        return await cls._coalesce(session, ("count", *sorted(filter_by.items())), query)
+
+    @classmethod
+    async def get_columns_by(
+        cls,
+        session: AsyncSession,
+        fields: Sequence[str],
+        **filter_by: Any,
+    ) -> Sequence[Row[Any]]:
+        """Select only `fields`, returning plain `Row` tuples that never enter the identity map."""
+        columns = cls.model_class.__table__.columns
+        unknown_fields = [field for field in fields if field not in columns]
+        if not fields or unknown_fields:
+            msg = "Invalid fields %r for %s" % (unknown_fields or fields, cls.model_class.__name__)
+            log.error(msg)
+            raise ValueError(msg)
+        filter_by = cls._scoped(session, filter_by)
+        # fmt: off
+        stmt = (
+            select(*(columns[field] for field in fields))
+            .filter_by(**filter_by)
+        )
+        # fmt: on
+
+        async def query() -> Sequence[Row[Any]]:
+            rows: Sequence[Row[Any]] = (await session.execute(stmt)).all()
+            return rows
+
+        return await cls._coalesce(session, ("columns", tuple(fields), *sorted(filter_by.items())), query)
+
     @classmethod
     async def get_by_id(cls, session: AsyncSession, id_: int) -> ModelT | None:
-        scalar_result: ScalarResult[ModelT] = await cls._get_by_fields(session=session, id=id_)
-        model_instance: ModelT | None = scalar_result.one_or_none()
-        return model_instance
+        return await cls._get_one_by_fields(session=session, id=id_)
 
     @classmethod
     async def get_all(cls, session: AsyncSession) -> Sequence[ModelT]:
-        stmt = select(cls.model_class)
+        stmt = select(cls.model_class).filter_by(**cls._scoped(session, {}))
         result: Result[tuple[ModelT, ...]] = await session.execute(stmt)
         model_instances: Sequence[ModelT] = result.scalars().all()
         return model_instances
@@ -75,8 +220,8 @@ class BaseRepository[ModelT: BaseOrm, CreateST: BaseModel, UpdateST: BaseModel](
         # fmt: off
         stmt = (
             update(cls.model_class)
-            .values(**update_schema.model_dump())
-            .filter_by(**filter_by)
+            .values(**update_schema.model_dump(exclude_unset=True))
+            .filter_by(**cls._scoped(session, filter_by))
         )
         # fmt: on
         await session.execute(stmt)
@@ -90,9 +235,9 @@ class BaseRepository[ModelT: BaseOrm, CreateST: BaseModel, UpdateST: BaseModel](
         # fmt: off
         stmt = (
             delete(cls.model_class)
-            .filter_by(**filter_by)
+            .filter_by(**cls._scoped(session, filter_by))
         )
-
+        # fmt: on
         await session.execute(stmt)
 
     @classmethod
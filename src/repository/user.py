@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import BigInteger, DateTime, bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from src.core.models import UserOrm
 from src.core.schemas import UserCreateS
 from src.core.schemas.user import UserUpdateS
-from src.repository.base import BaseRepository
+from src.repository.base import BaseRepository, get_session_bot_id
+from src.repository.user_stats import UserStatsRepository
 
 if TYPE_CHECKING:
-    from sqlalchemy import ScalarResult
+    from collections.abc import Mapping
+    from datetime import datetime
+
     from sqlalchemy.ext.asyncio import AsyncSession
 
 log = logging.getLogger(__name__)
@@ -18,11 +24,50 @@ log = logging.getLogger(__name__)
 class UserRepository(BaseRepository[UserOrm, UserCreateS, UserUpdateS]):
     model_class: type[UserOrm] = UserOrm
 
+    @classmethod
+    async def create(cls, session: AsyncSession, create_schema: UserCreateS) -> None:
+        # fmt: off
+        stmt = (
+            insert(cls.model_class)
+            .values(**cls._scoped(session, create_schema.model_dump()))
+            .returning(cls.model_class.is_active)
+        )
+        # fmt: on
+        is_active: bool = (await session.execute(stmt)).scalar_one()
+        await UserStatsRepository.on_users_created(session=session, total=1, active=int(is_active))
+
     @classmethod
     async def get_by_tg_id(cls, session: AsyncSession, tg_id: int) -> UserOrm | None:
-        scalar_result: ScalarResult[UserOrm] = await cls._get_by_fields(session=session, tg_id=tg_id)
-        user: UserOrm | None = scalar_result.one_or_none()
-        return user
+        return await cls._get_one_by_fields(session=session, tg_id=tg_id)
+
+    @classmethod
+    async def exists_by_tg_id(cls, session: AsyncSession, tg_id: int) -> bool:
+        return await cls.exists_by(session=session, tg_id=tg_id)
+
+    @classmethod
+    async def _update_by_filter_by(cls, session: AsyncSession, update_schema: UserUpdateS, **filter_by: Any) -> None:
+        if update_schema.is_active is None:
+            await super()._update_by_filter_by(session=session, update_schema=update_schema, **filter_by)
+            return
+
+        # Join the rows to their pre-update state to learn how many actually flipped `is_active`
+        # fmt: off
+        previous = (
+            select(cls.model_class.id, cls.model_class.is_active.label("was_active"))
+            .filter_by(**cls._scoped(session, filter_by))
+            .with_for_update()
+            .subquery()
+        )
+        stmt = (
+            update(cls.model_class)
+            .where(cls.model_class.id == previous.c.id)
+            .values(**update_schema.model_dump(exclude_unset=True))
+            .returning(previous.c.was_active, cls.model_class.is_active)
+        )
+        # fmt: on
+        changes = (await session.execute(stmt)).tuples().all()
+        active_delta = sum(int(is_active) - int(was_active) for was_active, is_active in changes)
+        await UserStatsRepository.on_users_activity_changed(session=session, active=active_delta)
 
     @classmethod
     async def update_by_tg_id(cls, session: AsyncSession, tg_id: int, update_schema: UserUpdateS) -> None:
@@ -32,6 +77,43 @@ class UserRepository(BaseRepository[UserOrm, UserCreateS, UserUpdateS]):
             tg_id=tg_id,
         )
 
+    @classmethod
+    async def update_last_seen(cls, session: AsyncSession, last_seen: Mapping[int, datetime]) -> int:
+        """Move `last_seen_at` forward for many users in one statement, returns the number of rows changed."""
+        if not last_seen:
+            return 0
+        # Two array parameters whatever the batch size, unnested into a join against `users`
+        seen = func.unnest(
+            bindparam("tg_ids", list(last_seen), type_=ARRAY(BigInteger)),
+            bindparam("seen_at", list(last_seen.values()), type_=ARRAY(DateTime(timezone=True))),
+        ).table_valued("tg_id", "seen_at")
+        # fmt: off
+        stmt = (
+            update(cls.model_class)
+            .where(cls.model_class.tg_id == seen.c.tg_id)
+            .where(cls.model_class.bot_id == get_session_bot_id(session))
+            .where(or_(cls.model_class.last_seen_at.is_(None), cls.model_class.last_seen_at < seen.c.seen_at))
+            # Being seen is not an edit of the user, keep `updated_at` as it is
+            .values(last_seen_at=seen.c.seen_at, updated_at=cls.model_class.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        # fmt: on
+        result = await session.execute(stmt)
+        updated: int = result.rowcount
+        return updated
+
+    @classmethod
+    async def _delete_by_filter_by(cls, session: AsyncSession, **filter_by: Any) -> None:
+        # fmt: off
+        stmt = (
+            delete(cls.model_class)
+            .filter_by(**cls._scoped(session, filter_by))
+            .returning(cls.model_class.is_active)
+        )
+        # fmt: on
+        deleted = (await session.execute(stmt)).scalars().all()
+        await UserStatsRepository.on_users_deleted(session=session, total=len(deleted), active=sum(deleted))
+
     @classmethod
     async def delete_by_tg_id(cls, session: AsyncSession, tg_id: int) -> None:
         await cls._delete_by_filter_by(session=session, tg_id=tg_id)
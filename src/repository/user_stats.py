@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import logging
+import random
+from datetime import UTC, date, datetime, time, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import BigInteger, cast, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.models import UserCounterOrm, UserOrm
+from src.core.schemas import UserStatsS
+from src.repository.base import get_session_bot_id
+from src.utils.enum import UserCounterEnum
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+log = logging.getLogger(__name__)
+
+SESSION_COUNTER_SHARD_KEY = "user_counter_shard"
+
+
+def new_users_counter(day: date) -> str:
+    return f"{UserCounterEnum.NEW}:{day.isoformat()}"
+
+
+def utc_today() -> date:
+    return datetime.now(UTC).date()
+
+
+class UserStatsRepository:
+    """Counters kept in `user_counters` and updated in the same transaction as the user writes.
+
+    Every counter is split over `shards` rows summed on read, so concurrent transactions holding
+    their counter row lock until commit do not all queue on one row.
+    Reading them is an index lookup of a few rows instead of a `COUNT(*)` over `users`.
+    Every bot has its own set of counters, picked by the session's bot id.
+    """
+
+    model_class: type[UserCounterOrm] = UserCounterOrm
+    shards: int = 16
+
+    @classmethod
+    def _session_shard(cls, session: AsyncSession) -> int:
+        """One random shard per session: a transaction only locks rows of its shard, always in name order."""
+        shard: int = session.info.setdefault(SESSION_COUNTER_SHARD_KEY, random.randrange(cls.shards))
+        return shard
+
+    @classmethod
+    async def increment(cls, session: AsyncSession, deltas: Mapping[str, int]) -> None:
+        bot_id = get_session_bot_id(session)
+        shard = cls._session_shard(session)
+        values = [
+            {"name": name, "bot_id": bot_id, "shard": shard, "value": delta}
+            for name, delta in sorted(deltas.items())
+            if delta
+        ]
+        if not values:
+            return
+        # Sorted names keep a stable row lock order between concurrent transactions
+        stmt = insert(cls.model_class).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.model_class.name, cls.model_class.bot_id, cls.model_class.shard],
+            set_={"value": cls.model_class.value + stmt.excluded.value},
+        )
+        await session.execute(stmt)
+
+    @classmethod
+    async def on_users_created(cls, session: AsyncSession, total: int, active: int) -> None:
+        await cls.increment(
+            session=session,
+            deltas={
+                UserCounterEnum.TOTAL: total,
+                UserCounterEnum.ACTIVE: active,
+                new_users_counter(utc_today()): total,
+            },
+        )
+
+    @classmethod
+    async def on_users_deleted(cls, session: AsyncSession, total: int, active: int) -> None:
+        await cls.increment(
+            session=session,
+            deltas={
+                UserCounterEnum.TOTAL: -total,
+                UserCounterEnum.ACTIVE: -active,
+            },
+        )
+
+    @classmethod
+    async def on_users_activity_changed(cls, session: AsyncSession, active: int) -> None:
+        await cls.increment(session=session, deltas={UserCounterEnum.ACTIVE: active})
+
+    @classmethod
+    async def get_stats(cls, session: AsyncSession) -> UserStatsS:
+        new_today = new_users_counter(utc_today())
+        # fmt: off
+        stmt = (
+            select(cls.model_class.name, cast(func.sum(cls.model_class.value), BigInteger))
+            .where(cls.model_class.name.in_([UserCounterEnum.TOTAL, UserCounterEnum.ACTIVE, new_today]))
+            .where(cls.model_class.bot_id == get_session_bot_id(session))
+            .group_by(cls.model_class.name)
+        )
+        # fmt: on
+        counters = dict((await session.execute(stmt)).tuples().all())
+        return UserStatsS(
+            total=counters.get(UserCounterEnum.TOTAL, 0),
+            active=counters.get(UserCounterEnum.ACTIVE, 0),
+            new_today=counters.get(new_today, 0),
+        )
+
+    @classmethod
+    async def reconcile(cls, session: AsyncSession, keep_days: int) -> UserStatsS:
+        """Recount users and overwrite the counters, fixing any drift.
+
+        All shard rows are created and locked before counting, so writers that have not committed yet
+        block on them and apply their deltas on top of the recounted values. The recounted value is
+        written to shard 0 and the other shards are zeroed.
+        """
+        bot_id = get_session_bot_id(session)
+        today = utc_today()
+        new_today = new_users_counter(today)
+        names = sorted([UserCounterEnum.TOTAL, UserCounterEnum.ACTIVE, new_today])
+        conflict_columns = [cls.model_class.name, cls.model_class.bot_id, cls.model_class.shard]
+
+        ensure_stmt = insert(cls.model_class).values(
+            [
+                {"name": name, "bot_id": bot_id, "shard": shard, "value": 0}
+                for name in names
+                for shard in range(cls.shards)
+            ]
+        )
+        await session.execute(ensure_stmt.on_conflict_do_nothing(index_elements=conflict_columns))
+        # fmt: off
+        lock_stmt = (
+            select(cls.model_class.id)
+            .where(cls.model_class.name.in_(names))
+            .where(cls.model_class.bot_id == bot_id)
+            .order_by(cls.model_class.name, cls.model_class.shard)
+            .with_for_update()
+        )
+        # fmt: on
+        await session.execute(lock_stmt)
+
+        today_start = datetime.combine(today, time.min, tzinfo=UTC)
+        # fmt: off
+        count_stmt = (
+            select(
+                func.count(),
+                func.count().filter(UserOrm.is_active.is_(True)),
+                func.count().filter(UserOrm.created_at >= today_start),
+            )
+            .select_from(UserOrm)
+            .where(UserOrm.bot_id == bot_id)
+        )
+        # fmt: on
+        total, active, created_today = (await session.execute(count_stmt)).one()
+
+        stats = UserStatsS(total=total, active=active, new_today=created_today)
+        values = {
+            UserCounterEnum.TOTAL: stats.total,
+            UserCounterEnum.ACTIVE: stats.active,
+            new_today: stats.new_today,
+        }
+        rows = [{"name": name, "bot_id": bot_id, "shard": 0, "value": values[name]} for name in names]
+        stmt = insert(cls.model_class).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={"value": stmt.excluded.value},
+        )
+        await session.execute(stmt)
+        # fmt: off
+        zero_stmt = (
+            update(cls.model_class)
+            .where(cls.model_class.name.in_(names))
+            .where(cls.model_class.bot_id == bot_id)
+            .where(cls.model_class.shard != 0)
+            .values(value=0)
+        )
+        # fmt: on
+        await session.execute(zero_stmt)
+
+        # fmt: off
+        cleanup_stmt = (
+            delete(cls.model_class)
+            .where(cls.model_class.bot_id == bot_id)
+            .where(cls.model_class.name.like(f"{UserCounterEnum.NEW}:%"))
+            .where(cls.model_class.name < new_users_counter(today - timedelta(days=keep_days)))
+        )
+        # fmt: on
+        await session.execute(cleanup_stmt)
+        log.info("User stats of bot id=%d reconciled: %s", bot_id, stats)
+        return stats
@@ -0,0 +1,7 @@
+from .activity import flush_user_activity
+from .user_stats import reconcile_user_stats
+
+__all__ = [
+    "flush_user_activity",
+    "reconcile_user_stats",
+]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from src.config import settings
+from src.core import db_manager
+from src.repository import UserRepository
+from src.repository.base import bot_session_info
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from src.utils.activity import ActivityTracker
+
+log = logging.getLogger(__name__)
+
+
+async def flush_user_activity(
+    tracker: ActivityTracker,
+    session_factory: async_sessionmaker[AsyncSession] = db_manager.session_factory,
+    batch_size: int = settings.activity.flush_batch_size,
+) -> int:
+    if not await tracker.begin_flush():
+        return 0
+    updated = 0
+    # One short transaction per batch; replaying a batch after a failure is harmless
+    # because `last_seen_at` only ever moves forward
+    async for last_seen in tracker.iter_flushing(batch_size=batch_size):
+        async with session_factory(info=bot_session_info(tracker.bot_id)) as session, session.begin():
+            updated += await UserRepository.update_last_seen(session=session, last_seen=last_seen)
+    await tracker.end_flush()
+    log.info("Flushed last seen time of %d users", updated)
+    return updated
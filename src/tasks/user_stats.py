@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from src.config import settings
+from src.core import db_manager
+from src.repository import UserStatsRepository
+from src.repository.base import bot_session_info
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from src.core.schemas import UserStatsS
+
+
+async def reconcile_user_stats(
+    bot_id: int,
+    session_factory: async_sessionmaker[AsyncSession] = db_manager.session_factory,
+    keep_days: int = settings.stats.keep_days,
+) -> UserStatsS:
+    async with session_factory(info=bot_session_info(bot_id)) as session, session.begin():
+        return await UserStatsRepository.reconcile(session=session, keep_days=keep_days)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+from datetime import UTC, date, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from redis.exceptions import ResponseError
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from redis.asyncio import Redis
+
+log = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """User activity kept in Redis: a HyperLogLog of users per UTC day and a hash of last-seen times.
+
+    Recording activity is one pipelined round trip. Last-seen times reach Postgres through
+    `begin_flush`/`iter_flushing`/`end_flush`, which hand the hash over to a separate key so new
+    activity keeps landing in a fresh hash while the old one is written out.
+    `bot_id` is the bot whose users are tracked, when a process serves several bots.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        key_prefix: str = "activity",
+        retention_days: int = 31,
+        bot_id: int | None = None,
+    ) -> None:
+        self.redis = redis
+        self.bot_id = bot_id
+        self.key_prefix = key_prefix
+        self.retention = timedelta(days=retention_days)
+        self.last_seen_key = f"{key_prefix}:last_seen"
+        self.flushing_key = f"{key_prefix}:last_seen:flushing"
+
+    def day_key(self, day: date) -> str:
+        return f"{self.key_prefix}:users:{day.isoformat()}"
+
+    async def touch(self, user_id: int, now: datetime | None = None) -> None:
+        now = now or datetime.now(UTC)
+        day_key = self.day_key(now.date())
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.pfadd(day_key, user_id)
+            pipe.expire(day_key, self.retention)
+            pipe.hset(self.last_seen_key, str(user_id), str(int(now.timestamp())))
+            await pipe.execute()
+
+    async def unique_users(self, days: int, today: date | None = None) -> int:
+        """Approximate number of distinct users seen over the last `days` UTC days, today included."""
+        today = today or datetime.now(UTC).date()
+        keys = [self.day_key(today - timedelta(days=offset)) for offset in range(days)]
+        count: int = await self.redis.pfcount(*keys)
+        return count
+
+    async def begin_flush(self) -> bool:
+        """Move pending last-seen times aside for flushing, returns False when there is nothing to flush."""
+        try:
+            # RENAMENX never replaces a flushing hash that is still pending (left by a failed flush or being
+            # flushed by another replica); that one is flushed first and new activity waits for the next round
+            await self.redis.renamenx(self.last_seen_key, self.flushing_key)
+        except ResponseError:  # no such key
+            return bool(await self.redis.exists(self.flushing_key))
+        return True
+
+    async def iter_flushing(self, batch_size: int) -> AsyncIterator[dict[int, datetime]]:
+        cursor = 0
+        while True:
+            cursor, chunk = await self.redis.hscan(self.flushing_key, cursor=cursor, count=batch_size)
+            if chunk:
+                yield {
+                    int(user_id): datetime.fromtimestamp(int(timestamp), tz=UTC) for user_id, timestamp in chunk.items()
+                }
+            if cursor == 0:
+                return
+
+    async def end_flush(self) -> None:
+        await self.redis.delete(self.flushing_key)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from src.utils.enum import PriorityEnum
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class PriorityLimit:
+    # Fraction of the in-flight budget this class may occupy; lower classes leave headroom for higher ones
+    share: float
+    max_queue: int
+    max_wait: float
+
+
+@dataclass(slots=True)
+class PriorityStats:
+    admitted: int = 0
+    shed: int = 0
+
+
+class AdmissionController:
+    """Bounded in-flight budget shared by priority classes.
+
+    An update is admitted while the number of in-flight updates is below its class limit and nobody
+    of the same or a higher class is waiting. Otherwise it waits in its class queue for at most
+    `max_wait` seconds, or is shed right away if the queue is full. Freed slots go to the highest class first.
+    """
+
+    def __init__(self, max_in_flight: int, limits: Mapping[PriorityEnum, PriorityLimit]) -> None:
+        if missing := [priority for priority in PriorityEnum if priority not in limits]:
+            msg = "Admission limits are missing for priorities %s" % ", ".join(missing)
+            log.error(msg)
+            raise ValueError(msg)
+        self.max_in_flight = max_in_flight
+        self.limits = dict(limits)
+        self.in_flight = 0
+        # Ordered from the highest priority to the lowest
+        self._queues: dict[PriorityEnum, deque[asyncio.Future[None]]] = {priority: deque() for priority in PriorityEnum}
+        self._stats = {priority: PriorityStats() for priority in PriorityEnum}
+
+    def _capacity(self, priority: PriorityEnum) -> int:
+        return max(1, int(self.max_in_flight * self.limits[priority].share))
+
+    def _has_waiters_above(self, priority: PriorityEnum) -> bool:
+        for other, queue in self._queues.items():
+            if queue:
+                return True
+            if other == priority:
+                return False
+        return False
+
+    async def acquire(self, priority: PriorityEnum) -> bool:
+        """Returns False when the update was shed; otherwise `release()` must be called once it is handled."""
+        stats = self._stats[priority]
+        if self.in_flight < self._capacity(priority) and not self._has_waiters_above(priority):
+            self.in_flight += 1
+            stats.admitted += 1
+            return True
+
+        limit = self.limits[priority]
+        queue = self._queues[priority]
+        if len(queue) >= limit.max_queue or limit.max_wait <= 0:
+            stats.shed += 1
+            return False
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        try:
+            async with asyncio.timeout(limit.max_wait):
+                await future
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the wait ended, pass it on
+                self.release()
+            elif future in queue:
+                queue.remove(future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            stats.shed += 1
+            return False
+        stats.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        for priority, queue in self._queues.items():
+            while queue and self.in_flight < self._capacity(priority):
+                future = queue.popleft()
+                if not future.done():
+                    future.set_result(None)
+                    self.in_flight += 1
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        """Queue depths and admission counters per class, for logs and metrics."""
+        return {
+            priority: {
+                "queued": len(self._queues[priority]),
+                "admitted": self._stats[priority].admitted,
+                "shed": self._stats[priority].shed,
+            }
+            for priority in PriorityEnum
+        } | {"total": {"in_flight": self.in_flight, "max_in_flight": self.max_in_flight}}
+
+    async def log_snapshot(self) -> None:
+        log.info("Admission: %s", self.snapshot())
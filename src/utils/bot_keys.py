@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+from aiogram.fsm.storage.base import DefaultKeyBuilder
+
+if TYPE_CHECKING:
+    from aiogram.fsm.storage.base import StorageKey
+
+
+def bot_key_prefix(prefix: str, bot_id: int, primary_bot_id: int | None) -> str:
+    """Redis key prefix of `bot_id`: the primary bot keeps `prefix` as is, every other bot gets its id appended.
+
+    The primary bot's keys then never change when bots are added next to it. `None` shares `prefix` between all bots.
+    """
+    if primary_bot_id is None or bot_id == primary_bot_id:
+        return prefix
+    return f"{prefix}:{bot_id}"
+
+
+class BotKeyBuilder(DefaultKeyBuilder):
+    """FSM keys with the bot id in them, except for the primary bot, whose keys stay the single-bot ones."""
+
+    def __init__(self, primary_bot_id: int, prefix: str = "fsm") -> None:
+        super().__init__(prefix=prefix, with_bot_id=True)
+        self.primary_bot_id = primary_bot_id
+        self._primary_builder = DefaultKeyBuilder(prefix=prefix)
+
+    def build(self, key: StorageKey, part: Literal["data", "state", "lock"] | None = None) -> str:
+        if key.bot_id == self.primary_bot_id:
+            return self._primary_builder.build(key, part)
+        return super().build(key, part)
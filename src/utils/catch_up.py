@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from aiogram import Bot, Dispatcher
+    from aiogram.types import Update
+    from redis.asyncio import Redis
+
+log = logging.getLogger(__name__)
+
+# Telegram never returns more than 100 updates per getUpdates call
+MAX_BATCH_SIZE = 100
+# Set in the middleware data of replayed updates, their concurrency is already bounded by `BacklogCatchUp`
+CATCH_UP_DATA_KEY = "catch_up_replay"
+
+
+@dataclass(slots=True)
+class CatchUpReport:
+    backlog: int = 0
+    duplicates: int = 0
+    retried: int = 0
+    failed: int = 0
+    batches: int = 0
+    duration: float = 0.0
+
+
+def ordering_key(update: Update) -> int | str:
+    """Updates sharing a key are processed strictly in `update_id` order."""
+    context = UserContextMiddleware.resolve_event_context(event=update)
+    if context.chat is not None:
+        return context.chat.id
+    if context.user is not None:
+        return context.user.id
+    return f"update:{update.update_id}"
+
+
+class BacklogCatchUp:
+    """Drain the updates that piled up while the bot was down before regular polling starts.
+
+    Updates are fetched in full `getUpdates` batches and fed to the dispatcher concurrently,
+    one sequential lane per chat. Ids of processed updates are recorded in a Redis set so a restart
+    in the middle of catch-up does not process the same update twice. An id is only recorded once
+    its `feed_update` succeeded, so updates interrupted by a crash are processed after the restart.
+
+    The offset is held at the first failed update, so Telegram redelivers it together with the updates after it
+    (the processed ones are skipped as duplicates). The rest of the failed update's chat waits for the retry to keep
+    its order. After `max_attempts` failures the update is dropped so one broken update cannot stall the catch-up.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        batch_size: int = MAX_BATCH_SIZE,
+        concurrency: int = 64,
+        dedup_ttl: int = 86400,
+        key_prefix: str = "catch_up",
+        max_attempts: int = 3,
+    ) -> None:
+        self.redis = redis
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.concurrency = concurrency
+        self.dedup_ttl = dedup_ttl
+        self.key_prefix = key_prefix
+        self.max_attempts = max_attempts
+
+    async def run(self, bot: Bot, dispatcher: Dispatcher) -> CatchUpReport:
+        report = CatchUpReport()
+        started = time.monotonic()
+        allowed_updates = dispatcher.resolve_used_update_types()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        offset: int | None = None
+        last_update_id = -1
+        attempts: Counter[int] = Counter()
+
+        while True:
+            # Requesting an offset confirms every update below it to Telegram, later ones are delivered again
+            updates = await bot.get_updates(
+                offset=offset,
+                limit=self.batch_size,
+                timeout=0,
+                allowed_updates=allowed_updates,
+            )
+            if not updates:
+                break
+            report.batches += 1
+            fresh = await self._deduplicate(bot=bot, updates=updates)
+            # Redelivered updates were already counted when they first arrived
+            report.backlog += sum(update.update_id > last_update_id for update in updates)
+            fresh_ids = {update.update_id for update in fresh}
+            report.duplicates += sum(
+                update.update_id > last_update_id and update.update_id not in fresh_ids for update in updates
+            )
+            last_update_id = max(last_update_id, updates[-1].update_id)
+
+            retry, dropped = await self._process_batch(bot, dispatcher, fresh, semaphore, attempts)
+            report.retried += len(retry)
+            report.failed += dropped
+            offset = min(retry) if retry else updates[-1].update_id + 1
+
+        report.duration = time.monotonic() - started
+        log.info(
+            "Caught up with %d pending updates (%d duplicates, %d retried, %d failed) in %d batches, %.2fs",
+            report.backlog,
+            report.duplicates,
+            report.retried,
+            report.failed,
+            report.batches,
+            report.duration,
+        )
+        return report
+
+    def _seen_key(self, bot: Bot) -> str:
+        return f"{self.key_prefix}:{bot.id}:seen"
+
+    async def _deduplicate(self, bot: Bot, updates: Sequence[Update]) -> list[Update]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.smismember(self._seen_key(bot), [update.update_id for update in updates])
+            (seen,) = await pipe.execute()
+        return [update for update, is_seen in zip(updates, seen, strict=True) if not is_seen]
+
+    async def _mark_seen(self, bot: Bot, update_id: int) -> None:
+        key = self._seen_key(bot)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(key, update_id)
+            pipe.expire(key, self.dedup_ttl)
+            await pipe.execute()
+
+    async def _process_batch(
+        self,
+        bot: Bot,
+        dispatcher: Dispatcher,
+        updates: Sequence[Update],
+        semaphore: asyncio.Semaphore,
+        attempts: Counter[int],
+    ) -> tuple[list[int], int]:
+        """Feed `updates` to the dispatcher; return the ids of failed updates to retry and the number of dropped ones."""
+        lanes: defaultdict[int | str, list[Update]] = defaultdict(list)
+        for update in updates:
+            lanes[ordering_key(update)].append(update)
+
+        async def process_lane(lane: list[Update]) -> tuple[list[int], int]:
+            retry: list[int] = []
+            dropped = 0
+            async with semaphore:
+                for update in lane:
+                    try:
+                        await dispatcher.feed_update(bot=bot, update=update, **{CATCH_UP_DATA_KEY: True})
+                    except Exception:
+                        attempts[update.update_id] += 1
+                        if attempts[update.update_id] < self.max_attempts:
+                            log.warning(
+                                "Failed to process pending update id=%d on attempt %d, retrying it",
+                                update.update_id,
+                                attempts[update.update_id],
+                                exc_info=True,
+                            )
+                            # The rest of the lane is redelivered with it and retried in order
+                            retry.append(update.update_id)
+                            break
+                        dropped += 1
+                        log.exception(
+                            "Failed to process pending update id=%d %d times, dropping it",
+                            update.update_id,
+                            attempts[update.update_id],
+                        )
+                        continue
+                    await self._mark_seen(bot=bot, update_id=update.update_id)
+            return retry, dropped
+
+        results = await asyncio.gather(*(process_lane(lane) for lane in lanes.values()))
+        return [update_id for retry, _ in results for update_id in retry], sum(dropped for _, dropped in results)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.utils.enum import CircuitStateEnum
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+    from sqlalchemy.orm import Session, sessionmaker
+    from sqlalchemy.pool import PoolProxiedConnection
+
+log = logging.getLogger(__name__)
+
+# connection_exception, insufficient_resources and operator_intervention (query_canceled, admin_shutdown, ...)
+UNAVAILABLE_SQLSTATE_CLASSES = ("08", "53", "57")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of running a statement while the database is considered unavailable."""
+
+
+class CircuitBreaker:
+    """Count-based circuit breaker over the outcomes of the last `window_size` calls.
+
+    Once at least `min_calls` outcomes are known and the share of failures (errors and calls slower than
+    `slow_call_duration`) reaches `failure_rate`, the circuit opens and `before_call()` fails fast for
+    `open_duration` seconds. After that up to `half_open_probes` calls are let through; the circuit closes
+    when all of them succeed and opens again on the first failure.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 50,
+        min_calls: int = 20,
+        failure_rate: float = 0.5,
+        slow_call_duration: float = 1.0,
+        open_duration: float = 10.0,
+        half_open_probes: int = 3,
+    ) -> None:
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.open_duration = open_duration
+        self.half_open_probes = half_open_probes
+        self.state = CircuitStateEnum.CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._failures = 0
+        self._changed_at = time.monotonic()
+        self._probes_left = 0
+        self._probe_successes = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == CircuitStateEnum.OPEN and time.monotonic() - self._changed_at < self.open_duration
+
+    def _transition(self, state: CircuitStateEnum) -> None:
+        log.log(
+            logging.INFO if state == CircuitStateEnum.CLOSED else logging.WARNING,
+            "Database circuit %s -> %s",
+            self.state,
+            state,
+        )
+        self.state = state
+        self._changed_at = time.monotonic()
+        self._outcomes.clear()
+        self._failures = 0
+        self._probes_left = self.half_open_probes
+        self._probe_successes = 0
+
+    def before_call(self) -> None:
+        if self.state == CircuitStateEnum.CLOSED:
+            return
+        # A half-open circuit whose probes never reported back hands out new ones after `open_duration`
+        if time.monotonic() - self._changed_at >= self.open_duration:
+            self._transition(CircuitStateEnum.HALF_OPEN)
+        if self.state == CircuitStateEnum.HALF_OPEN and self._probes_left > 0:
+            self._probes_left -= 1
+            return
+        raise CircuitOpenError("Database circuit is %s" % self.state)
+
+    def record(self, duration: float, failed: bool = False) -> None:
+        failed = failed or duration >= self.slow_call_duration
+        if self.state == CircuitStateEnum.HALF_OPEN:
+            if failed:
+                self._transition(CircuitStateEnum.OPEN)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CircuitStateEnum.CLOSED)
+            return
+        if self.state == CircuitStateEnum.OPEN:
+            # Late outcomes of calls started before the circuit opened
+            return
+
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(failed)
+        self._failures += failed
+        if len(self._outcomes) >= self.min_calls and self._failures >= self.failure_rate * len(self._outcomes):
+            self._transition(CircuitStateEnum.OPEN)
+
+
+def is_unavailable_error(error: BaseException, is_disconnect: bool = False) -> bool:
+    """Whether the error means the database is down or overloaded, as opposed to a bad query or a constraint."""
+    if is_disconnect or isinstance(error, TimeoutError | OSError):
+        return True
+    sqlstate = getattr(error, "sqlstate", None)
+    return isinstance(sqlstate, str) and sqlstate.startswith(UNAVAILABLE_SQLSTATE_CLASSES)
+
+
+def guard_database(engine: AsyncEngine, session_factory: sessionmaker[Session], breaker: CircuitBreaker) -> None:
+    """Fail session statements fast while `breaker` is open and feed it the outcome of every SQL statement.
+
+    The check runs before a pooled connection is requested, so an open circuit never waits on the pool.
+    Timed out pool checkouts, the first sign of a database that stopped answering, count as failures too.
+    """
+    sync_engine = engine.sync_engine
+    raw_connection = sync_engine.raw_connection
+
+    # A checkout timeout is raised by the pool before any statement or DBAPI call, so no engine event sees it.
+    # Every checkout goes through `raw_connection`, which also outlives the pools replaced by `dispose()`.
+    def guarded_raw_connection() -> PoolProxiedConnection:
+        started = time.monotonic()
+        try:
+            return raw_connection()
+        except PoolTimeoutError:
+            breaker.record(time.monotonic() - started, failed=True)
+            raise
+
+    sync_engine.raw_connection = guarded_raw_connection  # type: ignore[method-assign]
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def do_orm_execute(orm_execute_state: Any) -> None:
+        breaker.before_call()
+
+    @event.listens_for(session_factory, "before_flush")
+    def before_flush(session: Session, flush_context: Any, instances: Any) -> None:
+        breaker.before_call()
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        context._breaker_started = time.monotonic()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        breaker.record(time.monotonic() - context._breaker_started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context: Any) -> None:
+        error = exception_context.original_exception
+        if not is_unavailable_error(error, is_disconnect=exception_context.is_disconnect):
+            return
+        # No execution context when the connection itself could not be established
+        started = getattr(exception_context.execution_context, "_breaker_started", None)
+        breaker.record(time.monotonic() - started if started is not None else 0.0, failed=True)
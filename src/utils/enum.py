@@ -11,3 +11,38 @@ class LogLevelEnum(StrEnum):
 
 class LanguageEnum(StrEnum):
     EN = "en"
+
+
+class UserCounterEnum(StrEnum):
+    TOTAL = "total"
+    ACTIVE = "active"
+    NEW = "new"
+
+
+class ThrottlingBackendEnum(StrEnum):
+    MEMORY = "memory"
+    REDIS = "redis"
+
+
+class PriorityEnum(StrEnum):
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class JsonCodecEnum(StrEnum):
+    # orjson when it is installed, stdlib `json` otherwise
+    AUTO = "auto"
+    ORJSON = "orjson"
+    STDLIB = "json"
+
+
+class TracingExporterEnum(StrEnum):
+    FILE = "file"
+    OTLP = "otlp"
+
+
+class CircuitStateEnum(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from src.utils.enum import JsonCodecEnum
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class JsonCodec:
+    name: JsonCodecEnum
+    loads: Callable[[str | bytes], Any]
+    # Returns `str`, as aiogram and `RedisStorage` expect
+    dumps: Callable[[Any], str]
+
+
+STDLIB_CODEC = JsonCodec(name=JsonCodecEnum.STDLIB, loads=json.loads, dumps=json.dumps)
+
+
+def _orjson_codec() -> JsonCodec | None:
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    def dumps(obj: Any) -> str:
+        # Non-str keys are allowed by stdlib `json` and may appear in FSM data
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    return JsonCodec(name=JsonCodecEnum.ORJSON, loads=orjson.loads, dumps=dumps)
+
+
+@cache
+def get_json_codec(name: JsonCodecEnum = JsonCodecEnum.AUTO) -> JsonCodec:
+    if name == JsonCodecEnum.STDLIB:
+        return STDLIB_CODEC
+    codec = _orjson_codec()
+    if codec is None:
+        if name == JsonCodecEnum.ORJSON:
+            log.warning("orjson is not installed, falling back to stdlib json")
+        return STDLIB_CODEC
+    return codec
@@ -1,21 +1,138 @@
 from __future__ import annotations
 
-from logging import basicConfig
-from typing import TYPE_CHECKING
+import atexit
+import json
+import logging
+import queue
+import random
+import time
+from contextvars import ContextVar
+from logging import Filter, Formatter, LogRecord, StreamHandler
+from logging.handlers import QueueHandler, QueueListener
+from typing import TYPE_CHECKING, Any
 
 from src.config import settings
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     from src.utils.enum import LogLevelEnum
 
+update_id_var: ContextVar[int | None] = ContextVar("update_id", default=None)
+
+
+class UpdateContextFilter(Filter):
+    def filter(self, record: LogRecord) -> bool:
+        update_id = update_id_var.get()
+        record.update_id = "-" if update_id is None else update_id
+        return True
+
+
+class PerLoggerFilter(Filter):
+    """Base for filters configured per logger name; a name also covers its child loggers."""
+
+    def __init__(self, limits: Mapping[str, float]) -> None:
+        super().__init__()
+        self.limits = dict(limits)
+        self._resolved: dict[str, float | None] = {}
+
+    def resolve(self, name: str) -> float | None:
+        if name not in self._resolved:
+            matches = [prefix for prefix in self.limits if name == prefix or name.startswith(f"{prefix}.")]
+            self._resolved[name] = self.limits[max(matches, key=len)] if matches else None
+        return self._resolved[name]
+
+
+class SamplingFilter(PerLoggerFilter):
+    """Keep only a fraction of the records below WARNING."""
+
+    def filter(self, record: LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.resolve(record.name)
+        return rate is None or random.random() < rate
+
+
+class RateLimitFilter(PerLoggerFilter):
+    """Token bucket of `limit` records per second (and as much burst) per logger below ERROR."""
+
+    def __init__(self, limits: Mapping[str, float]) -> None:
+        super().__init__(limits)
+        self._buckets: dict[str, list[float]] = {}
+        self.dropped = 0
+
+    def filter(self, record: LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+        limit = self.resolve(record.name)
+        if limit is None:
+            return True
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(record.name, [limit, now])
+        bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit)
+        bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True
+        self.dropped += 1
+        return False
+
+
+class JsonFormatter(Formatter):
+    def format(self, record: LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "update_id": getattr(record, "update_id", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
 
 def configure_logging(
     level: LogLevelEnum = settings.logging.level,
     format_: str = settings.logging.log_format,
     datefmt: str = settings.logging.datefmt,
-) -> None:
-    basicConfig(
-        level=level,
-        format=format_,
-        datefmt=datefmt,
-    )
+    use_queue: bool = settings.logging.queue,
+    json_format: bool = settings.logging.json_format,
+    rate_limits: Mapping[str, float] = settings.logging.rate_limits,
+    sampling: Mapping[str, float] = settings.logging.sampling,
+) -> QueueListener | None:
+    """Configure the root logger.
+
+    With `use_queue` the calling thread (the event loop) only filters records and puts them on a
+    queue; formatting and writing to stderr happen in a `QueueListener` thread.
+    """
+    output_handler = StreamHandler()
+    output_handler.setFormatter(JsonFormatter(datefmt=datefmt) if json_format else Formatter(format_, datefmt))
+
+    listener: QueueListener | None = None
+    if use_queue:
+        log_queue: queue.SimpleQueue[LogRecord] = queue.SimpleQueue()
+        entry_handler: logging.Handler = QueueHandler(log_queue)
+        listener = QueueListener(log_queue, output_handler, respect_handler_level=True)
+    else:
+        entry_handler = output_handler
+
+    # Filters run on the entry handler, i.e. in the logging thread where the update context is set
+    entry_handler.addFilter(UpdateContextFilter())
+    if sampling:
+        entry_handler.addFilter(SamplingFilter(sampling))
+    if rate_limits:
+        entry_handler.addFilter(RateLimitFilter(rate_limits))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(entry_handler)
+    root.setLevel(level)
+
+    if listener is not None:
+        listener.start()
+        atexit.register(listener.stop)
+    return listener
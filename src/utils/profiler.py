@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+import re
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+UNSAFE_FILE_NAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def stats_file_name(key: str) -> str:
+    """`<key>.prof` with anything that could leave `output_dir` or break the path replaced."""
+    return f"{UNSAFE_FILE_NAME_CHARS.sub('-', key).lstrip('.')}.prof"
+
+
+class UpdateProfiler:
+    """Samples updates under cProfile and aggregates the stats per handler key.
+
+    Only one update is profiled at a time: cProfile hooks the whole thread, so concurrent
+    profiles would overwrite each other. Other tasks interleaving on the event loop while the
+    sampled update awaits show up in its profile too.
+    """
+
+    def __init__(self, output_dir: Path, sample_every: int = 0, flush_every: int = 50) -> None:
+        self.output_dir = output_dir
+        self.flush_every = flush_every
+        self.sample_every = sample_every
+        self.until: float | None = None
+        self._seen = 0
+        self._samples = 0
+        self._busy = False
+        self._stats: dict[str, pstats.Stats] = {}
+
+    @property
+    def active(self) -> bool:
+        if self.sample_every <= 0:
+            return False
+        if self.until is not None and time.monotonic() >= self.until:
+            self.disable()
+            return False
+        return True
+
+    def enable(self, sample_every: int = 1, duration: float | None = None) -> None:
+        self.sample_every = max(sample_every, 1)
+        self.until = None if duration is None else time.monotonic() + duration
+        self._seen = 0
+
+    def disable(self) -> None:
+        self.sample_every = 0
+        self.until = None
+        self.flush()
+
+    def should_sample(self) -> bool:
+        if self._busy:
+            return False
+        self._seen += 1
+        return self._seen % self.sample_every == 0
+
+    async def profile(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        self._busy = True
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return await call()
+        finally:
+            profile.disable()
+            self._busy = False
+            self._add(key, profile)
+
+    def _add(self, key: str, profile: cProfile.Profile) -> None:
+        if key in self._stats:
+            self._stats[key].add(profile)
+        else:
+            self._stats[key] = pstats.Stats(profile)
+        self._samples += 1
+        if self._samples % self.flush_every == 0:
+            # Runs inside the sampled update, which must not fail because of the profiler
+            try:
+                self.flush()
+            except OSError:
+                log.exception("Failed to write profiling stats to %s", self.output_dir)
+
+    def flush(self) -> list[Path]:
+        """Write one `<key>.prof` file per handler key, readable with `pstats` or snakeviz."""
+        if not self._stats:
+            return []
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for key, stats in self._stats.items():
+            path = self.output_dir / stats_file_name(key)
+            stats.dump_stats(path)
+            paths.append(path)
+        log.info("Profiling stats of %d samples written to %s", self._samples, self.output_dir)
+        return paths
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+class AbstractRateLimiter(ABC):
+    @abstractmethod
+    async def hit(self, key: str, rate: int, period: float) -> float:
+        """Register a hit, returning 0 if it is allowed or the seconds to wait before retrying."""
+        raise NotImplementedError()
+
+
+class TokenBucketRateLimiter(AbstractRateLimiter):
+    """Per-process token buckets, `rate` tokens refilled evenly over `period` seconds.
+
+    At most `max_keys` buckets are kept, the least recently hit one is dropped to make room.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        # key -> [tokens, updated_at, capacity, refill rate per second], least recently hit first
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    async def hit(self, key: str, rate: int, period: float) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = [float(rate), now, float(rate), rate / period]
+        else:
+            self._buckets.move_to_end(key)
+
+        tokens, updated_at, capacity, refill = bucket
+        tokens = min(capacity, tokens + (now - updated_at) * refill)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / refill
+
+
+SLIDING_WINDOW_SCRIPT: Final[str] = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+if redis.call('ZCARD', key) < limit then
+    redis.call('ZADD', key, now, now .. '-' .. ARGV[3])
+    redis.call('PEXPIRE', key, math.ceil(window / 1000))
+    return 0
+end
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return tonumber(oldest[2]) + window - now
+"""
+
+
+class RedisSlidingWindowRateLimiter(AbstractRateLimiter):
+    """Sliding window log shared by all replicas, checked and updated atomically by a Lua script."""
+
+    def __init__(self, redis: Redis, key_prefix: str = "throttling") -> None:
+        self.key_prefix = key_prefix
+        self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def hit(self, key: str, rate: int, period: float) -> float:
+        wait_us = await self._script(
+            keys=[f"{self.key_prefix}:{key}"],
+            args=[rate, int(period * 1_000_000), secrets.token_hex(4)],
+        )
+        return int(wait_us) / 1_000_000
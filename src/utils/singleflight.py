@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+
+@dataclass(slots=True)
+class SingleFlightStats:
+    executed: int = 0
+    coalesced: int = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution shared by every caller."""
+
+    def __init__(self) -> None:
+        self.stats = SingleFlightStats()
+        self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+
+    async def do[ResultT](self, key: Hashable, func: Callable[[], Awaitable[ResultT]]) -> ResultT:
+        while (future := self._calls.get(key)) is not None:
+            self.stats.coalesced += 1
+            try:
+                result: ResultT = await asyncio.shield(future)
+                return result
+            except asyncio.CancelledError:
+                # The leader was cancelled, not this caller: run the call again
+                if not future.cancelled():
+                    raise
+                self.stats.coalesced -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats.executed += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
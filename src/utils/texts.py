@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any, Final
 
 import aiofiles
 
+from src.config import settings
 from src.utils.enum import LanguageEnum
+from src.utils.json_codec import get_json_codec
 
 ROOT_DIR: Final[Path] = Path(__file__).parent.parent.parent
 
@@ -16,4 +17,4 @@ TEXTS_DIR: Final[Path] = ROOT_DIR / "texts"
 async def load_json_text(lang: LanguageEnum = LanguageEnum.EN) -> Any:
     async with aiofiles.open(file=TEXTS_DIR / f"{lang}.json", encoding="utf-8") as f:
         text = await f.read()
-        return json.loads(text)
+        return get_json_codec(settings.serialization.json_codec).loads(text)
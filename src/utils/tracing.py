@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.fsm.storage.redis import RedisStorage
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import event
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from pathlib import Path
+
+    from aiogram import Bot
+    from aiogram.client.session.middlewares.base import NextRequestMiddlewareType
+    from aiogram.fsm.state import State
+    from aiogram.fsm.storage.base import StorageKey
+    from aiogram.methods import Response, TelegramMethod
+    from aiogram.methods.base import TelegramType
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+log = logging.getLogger(__name__)
+
+current_span_var: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@dataclass(slots=True)
+class Span:
+    trace_id: int
+    span_id: int
+    parent_id: int | None
+    name: str
+    kind: str
+    start_ns: int
+    end_ns: int = 0
+    error: str | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": f"{self.trace_id:032x}",
+            "span_id": f"{self.span_id:016x}",
+            "parent_id": f"{self.parent_id:016x}" if self.parent_id is not None else None,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class AbstractSpanExporter(ABC):
+    @abstractmethod
+    async def export(self, spans: Sequence[Span]) -> None:
+        pass
+
+    async def close(self) -> None:
+        """Optional hook to release the exporter's resources on shutdown."""
+        return None
+
+
+class FileSpanExporter(AbstractSpanExporter):
+    """Append spans as JSON lines, written from a worker thread."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def _write(self, lines: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write(lines)
+
+    async def export(self, spans: Sequence[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        await asyncio.to_thread(self._write, lines)
+
+
+class OtlpJsonSpanExporter(AbstractSpanExporter):
+    """POST spans to an OTLP/HTTP collector using the JSON encoding (`/v1/traces`)."""
+
+    # OTLP SpanKind values
+    KINDS = {"internal": 1, "server": 2, "client": 3}
+
+    def __init__(self, endpoint: str, service_name: str) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._session: aiohttp.ClientSession | None = None
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> dict[str, Any]:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def _encode(self, span: Span) -> dict[str, Any]:
+        encoded = {
+            "traceId": f"{span.trace_id:032x}",
+            "spanId": f"{span.span_id:016x}",
+            "name": span.name,
+            "kind": self.KINDS.get(span.kind, 1),
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [self._attribute(key, value) for key, value in span.attributes.items()],
+            # STATUS_CODE_OK / STATUS_CODE_ERROR
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id is not None:
+            encoded["parentSpanId"] = f"{span.parent_id:016x}"
+        return encoded
+
+    async def export(self, spans: Sequence[Span]) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": [self._encode(span) for span in spans]}],
+                }
+            ]
+        }
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        async with self._session.post(self.endpoint, json=payload) as response:
+            response.raise_for_status()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class Tracer:
+    """Spans propagated through contextvars with a head-based sampling decision per trace.
+
+    Outside of a sampled trace `span()` is a no-op costing one context variable lookup, so the
+    instrumentation can stay on the hot path. Finished spans are buffered and exported by `flush()`.
+    """
+
+    def __init__(self, exporter: AbstractSpanExporter, sample_rate: float, max_buffered: int = 10_000) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.max_buffered = max_buffered
+        self.dropped = 0
+        self._finished: list[Span] = []
+
+    def _finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        if len(self._finished) >= self.max_buffered:
+            self.dropped += 1
+            return
+        self._finished.append(span)
+
+    def start_span(self, name: str, kind: str = "internal", **attributes: Any) -> Span | None:
+        """Start a child of the current span without making it current, for callback-style instrumentation."""
+        parent = current_span_var.get()
+        if parent is None:
+            return None
+        return Span(
+            trace_id=parent.trace_id,
+            span_id=random.getrandbits(64),
+            parent_id=parent.span_id,
+            name=name,
+            kind=kind,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+
+    def end_span(self, span: Span, error: BaseException | None = None) -> None:
+        if error is not None:
+            span.error = repr(error)
+        self._finish(span)
+
+    @contextmanager
+    def _activate(self, span: Span) -> Iterator[Span]:
+        token = current_span_var.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            current_span_var.reset(token)
+            self._finish(span)
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """Root span of a new trace, recorded for `sample_rate` of the calls."""
+        if random.random() >= self.sample_rate:
+            yield None
+            return
+        span = Span(
+            trace_id=random.getrandbits(128),
+            span_id=random.getrandbits(64),
+            parent_id=None,
+            name=name,
+            kind="server",
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        with self._activate(span):
+            yield span
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Span | None]:
+        span = self.start_span(name, kind, **attributes)
+        if span is None:
+            yield None
+            return
+        with self._activate(span):
+            yield span
+
+    async def flush(self) -> int:
+        spans, self._finished = self._finished, []
+        if not spans:
+            return 0
+        try:
+            await self.exporter.export(spans)
+        except Exception:
+            log.exception("Failed to export %d spans", len(spans))
+            return 0
+        if self.dropped:
+            log.warning("Dropped %d spans, the export buffer was full", self.dropped)
+            self.dropped = 0
+        return len(spans)
+
+    async def close(self) -> None:
+        await self.flush()
+        await self.exporter.close()
+
+
+def instrument_engine(engine: AsyncEngine, tracer: Tracer) -> None:
+    """A `client` span per SQL statement; the async greenlet shares the caller's contextvars."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        context._tracing_span = tracer.start_span("sql", kind="client", statement=statement[:500])
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if (span := getattr(context, "_tracing_span", None)) is not None:
+            span.attributes["rowcount"] = cursor.rowcount
+            tracer.end_span(span)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context: Any) -> None:
+        context = exception_context.execution_context
+        if (span := getattr(context, "_tracing_span", None)) is not None:
+            tracer.end_span(span, error=exception_context.original_exception)
+
+
+class TracingPipeline(Pipeline):
+    tracer: Tracer
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        with self.tracer.span("redis.pipeline", kind="client", commands=len(self.command_stack)):
+            return await super().execute(raise_on_error=raise_on_error)
+
+
+class TracingRedis(Redis):
+    """`Redis` client with a span per command and per pipeline; build it with `from_url` and set `tracer`."""
+
+    tracer: Tracer
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        with self.tracer.span(f"redis.{args[0]}", kind="client"):
+            return await super().execute_command(*args, **options)  # type: ignore[no-untyped-call]
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        pipeline = TracingPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+        pipeline.tracer = self.tracer
+        return pipeline
+
+
+class TracingRedisStorage(RedisStorage):
+    """FSM storage with a span per state/data access."""
+
+    def __init__(self, *args: Any, tracer: Tracer, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.tracer = tracer
+
+    async def set_state(self, key: StorageKey, state: str | State | None = None) -> None:
+        with self.tracer.span("fsm.set_state"):
+            await super().set_state(key, state)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        with self.tracer.span("fsm.get_state"):
+            return await super().get_state(key)
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        with self.tracer.span("fsm.set_data"):
+            await super().set_data(key, data)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        with self.tracer.span("fsm.get_data"):
+            return await super().get_data(key)
+
+
+class TracingRequestMiddleware(BaseRequestMiddleware):
+    """A `client` span per outbound Bot API request."""
+
+    def __init__(self, tracer: Tracer) -> None:
+        self.tracer = tracer
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        with self.tracer.span(f"bot_api.{method.__api_method__}", kind="client"):
+            return await make_request(bot, method)
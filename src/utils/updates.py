@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from aiogram.dispatcher.middlewares.error import ErrorsMiddleware
+from aiogram.filters import Command
+from aiogram.types import Message, Update
+
+if TYPE_CHECKING:
+    from aiogram import BaseMiddleware, Dispatcher, Router
+    from aiogram.types import TelegramObject
+
+
+def extract_command(event: TelegramObject) -> str | None:
+    """Cheaply pull `start` out of `/start@bot payload` without running any filters."""
+    message = event.message if isinstance(event, Update) else event
+    if not isinstance(message, Message) or not message.text or not message.text.startswith("/"):
+        return None
+    command = message.text[1:].split(maxsplit=1)[0] if len(message.text) > 1 else ""
+    return command.split("@", maxsplit=1)[0].lower() or None
+
+
+def registered_commands(router: Router) -> frozenset[str]:
+    """Lowercase names of the commands handled through `Command` filters by `router` and its sub-routers."""
+    commands: set[str] = set()
+    for sub_router in router.chain_tail:
+        for handler in sub_router.message.handlers:
+            for command_filter in handler.flags.get("commands", []):
+                if isinstance(command_filter, Command):
+                    commands.update(command.lower() for command in command_filter.commands if isinstance(command, str))
+    return frozenset(commands)
+
+
+def register_before_builtins(dispatcher: Dispatcher, middleware: BaseMiddleware) -> None:
+    """Register an update outer middleware ahead of the ones `Dispatcher` adds itself (errors, user and FSM context).
+
+    The FSM context middleware reads the state from the storage and takes the events isolation lock for every update,
+    so middlewares that reject updates have to run before it to make rejecting cheap. They run in registration order
+    and, being outside of the errors middleware, their exceptions do not reach the error handlers.
+    """
+    middlewares = dispatcher.update.outer_middleware._middlewares
+    index = next(
+        (index for index, registered in enumerate(middlewares) if isinstance(registered, ErrorsMiddleware)),
+        len(middlewares),
+    )
+    middlewares.insert(index, middleware)
@@ -10,6 +10,8 @@ from src.config import BaseDatabaseConfig, RedisConfig
 from src.core.db_manager import DatabaseManager
 
 BASE_DIR: Final[Path] = Path(__file__).resolve().parent.parent
+# Id of the bot behind `MockedBot`, the test sessions and the mock data
+TEST_BOT_ID: Final[int] = 42
 
 
 class TestSettings(BaseSettings):
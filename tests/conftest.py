@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import pytest
@@ -15,8 +16,9 @@ from sqlalchemy import insert
 from src.config import settings
 from src.core import db_manager
 from src.core.models import BaseOrm, UserOrm
+from src.repository.base import bot_session_info
 from src.utils.texts import load_json_text
-from tests.config import test_db_manager, test_settings
+from tests.config import BASE_DIR, TEST_BOT_ID, test_db_manager, test_settings
 from tests.integration_tests.utils import MOCK_USERS
 from tests.mock_bot import MockedBot
 
@@ -24,6 +26,7 @@ if TYPE_CHECKING:
     from asyncio import AbstractEventLoop
     from collections.abc import AsyncGenerator, Generator
 
+    from _pytest.config.argparsing import Parser
     from _pytest.fixtures import SubRequest
     from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -31,6 +34,22 @@ SKIP_MESSAGE_PATTERN = 'Need "--{db}" option with {db} URI to run'
 INVALID_URI_PATTERN = "Invalid {db} URI {uri!r}: {err}"
 
 
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("query plans")
+    group.addoption(
+        "--query-plans",
+        action="store_true",
+        help="Seed the test DB and check EXPLAIN ANALYZE plans of repository queries",
+    )
+    group.addoption("--query-plans-users", type=int, default=1_000_000, help="Users to seed for query plans")
+    group.addoption(
+        "--query-plans-dir",
+        type=Path,
+        default=BASE_DIR / "query_plans",
+        help="Directory the plans are written to for diffing",
+    )
+
+
 @pytest.fixture(scope="session", autouse=True)
 def event_loop(request: SubRequest) -> Generator[AbstractEventLoop, None]:
     loop = asyncio.get_event_loop_policy().new_event_loop()
@@ -50,7 +69,7 @@ async def prepare_db() -> AsyncGenerator[None, None]:
 
     async with test_db_manager.session_factory() as session:
         for mock_user in MOCK_USERS:
-            stmt = insert(UserOrm).values(**mock_user)
+            stmt = insert(UserOrm).values(**mock_user, bot_id=TEST_BOT_ID)
             await session.execute(stmt)
         await session.commit()
 
@@ -61,7 +80,7 @@ async def prepare_db() -> AsyncGenerator[None, None]:
 
 @pytest_asyncio.fixture(scope="function")
 async def session() -> AsyncGenerator[AsyncSession, None]:
-    async with test_db_manager.session_factory() as session:
+    async with test_db_manager.session_factory(info=bot_session_info(TEST_BOT_ID)) as session:
         yield session
 
 
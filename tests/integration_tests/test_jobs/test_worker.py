@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from src.jobs import BaseJob, JobQueue, Worker
+from src.repository.base import get_session_bot_id
+from tests.config import TEST_BOT_ID, test_db_manager
+from tests.mock_bot import MockedBot
+
+if TYPE_CHECKING:
+    from aiogram.fsm.storage.redis import RedisStorage
+
+    from src.jobs import JobContext
+
+SECOND_BOT_ID = 1_000_002
+
+attempts: list[int] = []
+# (bot the job ran as, bot its session is scoped to)
+job_bots: list[tuple[int, int]] = []
+
+
+class FlakyTestJob(BaseJob):
+    fail_attempts: int
+
+    async def run(self, context: JobContext) -> None:
+        attempts.append(context.attempt)
+        if context.attempt <= self.fail_attempts:
+            raise RuntimeError("Job failed")
+
+
+class BotScopeTestJob(BaseJob):
+    async def run(self, context: JobContext) -> None:
+        job_bots.append((context.bot.id, get_session_bot_id(context.session)))
+
+
+class TestWorker:
+    async def test_retries_then_acks(self, bot: MockedBot, redis_storage: RedisStorage) -> None:
+        attempts.clear()
+        queue = JobQueue(redis=redis_storage.redis, prefix="test_jobs")
+        worker = Worker(
+            queue=queue,
+            session_factory=test_db_manager.session_factory,
+            bots=[bot],
+            concurrency=2,
+            backoff_base=0.01,
+            poll_interval=0.01,
+        )
+        await queue.enqueue(FlakyTestJob(fail_attempts=1), bot_id=bot.id)
+
+        running = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.5)
+        worker.stop()
+        await running
+
+        assert attempts == [1, 2]
+        async with redis_storage.redis.pipeline(transaction=False) as pipe:
+            pipe.hlen(queue.data_key)
+            pipe.zcard(queue.in_flight_key)
+            assert await pipe.execute() == [0, 0]
+
+    async def test_runs_as_the_enqueuing_bot(self, bot: MockedBot, redis_storage: RedisStorage) -> None:
+        job_bots.clear()
+        queue = JobQueue(redis=redis_storage.redis, prefix="test_jobs")
+        second_bot = MockedBot(token=f"{SECOND_BOT_ID}:TEST")
+        worker = Worker(
+            queue=queue,
+            session_factory=test_db_manager.session_factory,
+            bots=[bot, second_bot],
+            poll_interval=0.01,
+        )
+        await queue.enqueue(BotScopeTestJob(), bot_id=SECOND_BOT_ID)
+        unknown_bot_job_id = await queue.enqueue(BotScopeTestJob(), bot_id=SECOND_BOT_ID + 1)
+
+        running = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.2)
+        worker.stop()
+        await running
+
+        assert job_bots == [(SECOND_BOT_ID, SECOND_BOT_ID)]
+        async with redis_storage.redis.pipeline(transaction=False) as pipe:
+            pipe.lrange(queue.dead_key, 0, -1)
+            assert await pipe.execute() == [[unknown_bot_job_id.encode()]]
+
+    async def test_expired_visibility_makes_job_ready_again(self, redis_storage: RedisStorage) -> None:
+        queue = JobQueue(redis=redis_storage.redis, prefix="test_jobs")
+        job_id = await queue.enqueue(FlakyTestJob(fail_attempts=0), bot_id=TEST_BOT_ID)
+
+        first = await queue.reserve(visibility_timeout=0.01)
+        await asyncio.sleep(0.05)
+        second = await queue.reserve(visibility_timeout=10)
+
+        assert first is not None and second is not None
+        assert first.envelope.id == second.envelope.id == job_id
+        assert (first.attempt, second.attempt) == (1, 2)
+        assert await queue.reserve(visibility_timeout=10) is None
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from aiogram.types import TelegramObject
+
+from src.core.schemas import UserCreateS
+from src.middlewares import SessionDepMiddleware
+from src.repository import UserRepository
+from src.repository.base import bot_session_info
+from tests.config import TEST_BOT_ID, test_db_manager
+from tests.mock_bot import MockedBot
+
+
+async def user_exists(tg_id: int) -> bool:
+    async with test_db_manager.session_factory(info=bot_session_info(TEST_BOT_ID)) as session:
+        return await UserRepository.exists_by_tg_id(session=session, tg_id=tg_id)
+
+
+class TestSessionDepMiddleware:
+    async def test_commits_once_after_handler(self) -> None:
+        middleware = SessionDepMiddleware(session_factory=test_db_manager.session_factory)
+        tg_ids = [900_000_101, 900_000_102]
+
+        async def handler(event: TelegramObject, data: dict[str, Any]) -> None:
+            for tg_id in tg_ids:
+                create_schema = UserCreateS(tg_id=tg_id, first_name="Uow", username=None, last_name=None)
+                await UserRepository.create(session=data["session"], create_schema=create_schema)
+            assert not await user_exists(tg_ids[0])
+
+        await middleware(handler, Mock(spec=TelegramObject), {"bot": MockedBot()})
+
+        assert all([await user_exists(tg_id) for tg_id in tg_ids])
+        async with test_db_manager.session_factory(info=bot_session_info(TEST_BOT_ID)) as session, session.begin():
+            for tg_id in tg_ids:
+                await UserRepository.delete_by_tg_id(session=session, tg_id=tg_id)
+
+    async def test_rolls_back_on_error(self) -> None:
+        middleware = SessionDepMiddleware(session_factory=test_db_manager.session_factory)
+        tg_id = 900_000_103
+
+        async def handler(event: TelegramObject, data: dict[str, Any]) -> None:
+            create_schema = UserCreateS(tg_id=tg_id, first_name="Uow", username=None, last_name=None)
+            await UserRepository.create(session=data["session"], create_schema=create_schema)
+            raise RuntimeError("handler failed")
+
+        with pytest.raises(RuntimeError):
+            await middleware(handler, Mock(spec=TelegramObject), {"bot": MockedBot()})
+
+        assert not await user_exists(tg_id)
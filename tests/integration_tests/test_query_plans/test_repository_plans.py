@@ -0,0 +1,179 @@
+"""EXPLAIN (ANALYZE, BUFFERS) of every repository query shape against a seeded `users` table.
+
+Opt-in and slow, run with: pytest tests/integration_tests/test_query_plans --query-plans [--query-plans-users N]
+Plans are written to `--query-plans-dir` as `<shape>.json` so runs can be diffed.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+
+from src.core.schemas import UserCreateS, UserUpdateS
+from src.repository import UserRepository, UserStatsRepository
+from src.repository.base import bot_session_info
+from tests.config import TEST_BOT_ID, test_db_manager
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Awaitable, Callable, Iterator
+    from pathlib import Path
+
+    from _pytest.fixtures import SubRequest
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Far above real Telegram ids used by the mock users, so the seeded rows are easy to remove
+TG_ID_BASE = 9_000_000_000_000
+# Tables big enough in production that a sequential scan on them is a regression
+HOT_RELATIONS = frozenset({"users"})
+# How a hot relation may be read; a Bitmap Heap Scan is fed by a Bitmap Index Scan
+INDEX_SCANS = frozenset({"Index Scan", "Index Only Scan", "Bitmap Heap Scan"})
+
+
+@dataclass(frozen=True, slots=True)
+class QueryShape:
+    name: str
+    call: Callable[[AsyncSession, int], Awaitable[object]]
+    max_buffers: int = 64
+    # Whether the shape looks rows of a hot relation up, so its plan must read one through an index
+    uses_index: bool = True
+
+
+SHAPES = [
+    QueryShape("get_by_tg_id", lambda session, tg_id: UserRepository.get_by_tg_id(session=session, tg_id=tg_id)),
+    QueryShape("get_by_fields", lambda session, tg_id: UserRepository._get_by_fields(session=session, tg_id=tg_id)),
+    QueryShape("exists_by_tg_id", lambda session, tg_id: UserRepository.exists_by_tg_id(session=session, tg_id=tg_id)),
+    QueryShape(
+        "get_columns_by_tg_id",
+        lambda session, tg_id: UserRepository.get_columns_by(session=session, fields=["id", "is_active"], tg_id=tg_id),
+    ),
+    QueryShape(
+        "update_by_tg_id",
+        lambda session, tg_id: UserRepository.update_by_tg_id(
+            session=session, tg_id=tg_id, update_schema=UserUpdateS(first_name="Renamed")
+        ),
+    ),
+    QueryShape(
+        "update_activity_by_tg_id",
+        lambda session, tg_id: UserRepository.update_by_tg_id(
+            session=session, tg_id=tg_id, update_schema=UserUpdateS(is_active=False)
+        ),
+    ),
+    QueryShape(
+        "update_last_seen",
+        lambda session, tg_id: UserRepository.update_last_seen(
+            session=session, last_seen={tg_id + offset: datetime.now(UTC) for offset in range(100)}
+        ),
+        max_buffers=1024,
+    ),
+    QueryShape(
+        "create",
+        lambda session, tg_id: UserRepository.create(
+            session=session,
+            create_schema=UserCreateS(tg_id=tg_id - TG_ID_BASE, first_name="New", username=None, last_name=None),
+        ),
+        uses_index=False,
+    ),
+    QueryShape("delete_by_tg_id", lambda session, tg_id: UserRepository.delete_by_tg_id(session=session, tg_id=tg_id)),
+    QueryShape("get_stats", lambda session, tg_id: UserStatsRepository.get_stats(session=session), uses_index=False),
+]
+
+
+@pytest_asyncio.fixture(scope="session")
+async def seeded_users(request: SubRequest) -> AsyncGenerator[int, None]:
+    if not request.config.getoption("--query-plans"):
+        pytest.skip('Need "--query-plans" option to run')
+    users: int = request.config.getoption("--query-plans-users")
+    async with test_db_manager.engine.begin() as conn:
+        await conn.execute(
+            text(
+                """
+                INSERT INTO users (bot_id, tg_id, first_name, username, last_name, is_active, last_seen_at)
+                SELECT
+                    :bot_id, CAST(:base AS BIGINT) + g, 'user' || g, 'plan_user_' || g, NULL,
+                    g % 10 <> 0, now() - g * interval '1 second'
+                FROM generate_series(1, :users) AS g
+                """
+            ),
+            {"bot_id": TEST_BOT_ID, "base": TG_ID_BASE, "users": users},
+        )
+        await conn.execute(text("ANALYZE users"))
+    try:
+        yield users
+    finally:
+        async with test_db_manager.engine.begin() as conn:
+            await conn.execute(text("DELETE FROM users WHERE tg_id > :base"), {"base": TG_ID_BASE})
+
+
+async def capture_statements(shape: QueryShape, tg_id: int) -> list[tuple[str, Any]]:
+    """Run the shape in a rolled back transaction and return the SQL it sent to Postgres."""
+    statements: list[tuple[str, Any]] = []
+
+    def on_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(test_db_manager.engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        async with test_db_manager.session_factory(info=bot_session_info(TEST_BOT_ID)) as session:
+            try:
+                await shape.call(session, tg_id)
+            finally:
+                await session.rollback()
+    finally:
+        event.remove(test_db_manager.engine.sync_engine, "before_cursor_execute", on_execute)
+    return statements
+
+
+async def explain(statement: str, parameters: Any) -> dict[str, Any]:
+    async with test_db_manager.engine.connect() as conn:
+        try:
+            result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+            raw = result.scalar_one()
+        finally:
+            # ANALYZE really executes writes, never keep them
+            await conn.rollback()
+    plan: dict[str, Any] = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    return plan
+
+
+def iter_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+class TestRepositoryQueryPlans:
+    @pytest.mark.parametrize("shape", SHAPES, ids=[shape.name for shape in SHAPES])
+    async def test_query_plan(self, shape: QueryShape, seeded_users: int, request: SubRequest) -> None:
+        output_dir: Path = request.config.getoption("--query-plans-dir")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        statements = await capture_statements(shape, tg_id=TG_ID_BASE + seeded_users // 2)
+        assert statements, "%s sent no SQL" % shape.name
+
+        plans: list[dict[str, Any]] = [
+            {"statement": statement, "plan": await explain(statement, parameters)}
+            for statement, parameters in statements
+        ]
+        (output_dir / f"{shape.name}.json").write_text(json.dumps(plans, indent=2, default=str))
+
+        # Plan shape and buffers only: wall-clock time of a cold run depends on the machine, not on the query
+        hot_scans: list[str] = []
+        for entry in plans:
+            plan = entry["plan"]
+            scans = [
+                node["Node Type"]
+                for node in iter_nodes(plan["Plan"])
+                if node["Node Type"].endswith("Scan") and node.get("Relation Name") in HOT_RELATIONS
+            ]
+            not_indexed = [scan for scan in scans if scan not in INDEX_SCANS]
+            buffers = plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get("Shared Read Blocks", 0)
+            assert not not_indexed, "%s on a hot relation in %s:\n%s" % (not_indexed, shape.name, entry["statement"])
+            assert buffers <= shape.max_buffers, "%s touched %d buffers" % (shape.name, buffers)
+            hot_scans.extend(scans)
+        if shape.uses_index:
+            assert hot_scans, "%s read no hot relation through an index" % shape.name
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pytest
+
+from src.core.schemas import UserCreateS
+from src.repository import UserRepository, UserStatsRepository
+from src.repository.base import bot_session_info
+from tests.config import test_db_manager
+
+FIRST_BOT_ID = 1_000_001
+SECOND_BOT_ID = 1_000_002
+
+
+class TestBotScope:
+    async def test_bots_see_only_their_own_users(self) -> None:
+        tg_id = 900_000_201
+        create_schema = UserCreateS(tg_id=tg_id, first_name="Scoped", username="scoped_user", last_name=None)
+        async with (
+            test_db_manager.session_factory(info=bot_session_info(FIRST_BOT_ID)) as first,
+            test_db_manager.session_factory(info=bot_session_info(SECOND_BOT_ID)) as second,
+        ):
+            try:
+                await UserRepository.create(session=first, create_schema=create_schema)
+                assert await UserRepository.exists_by_tg_id(session=first, tg_id=tg_id)
+                assert not await UserRepository.exists_by_tg_id(session=second, tg_id=tg_id)
+
+                # The same Telegram user may register with every bot
+                await UserRepository.create(session=second, create_schema=create_schema)
+                user = await UserRepository.get_by_tg_id(session=second, tg_id=tg_id)
+                assert user is not None
+                assert user.bot_id == SECOND_BOT_ID
+
+                await UserRepository.delete_by_tg_id(session=first, tg_id=tg_id)
+                assert await UserRepository.exists_by_tg_id(session=second, tg_id=tg_id)
+
+                first_stats = await UserStatsRepository.get_stats(session=first)
+                second_stats = await UserStatsRepository.get_stats(session=second)
+                assert (first_stats.total, second_stats.total) == (0, 1)
+            finally:
+                await first.rollback()
+                await second.rollback()
+
+    async def test_session_without_bot_is_refused(self) -> None:
+        async with test_db_manager.session_factory() as session:
+            with pytest.raises(RuntimeError):
+                await UserRepository.exists_by_tg_id(session=session, tg_id=900_000_202)
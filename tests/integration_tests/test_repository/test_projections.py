@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import update
+
+from src.core.models import UserOrm
+from src.repository import UserRepository
+from tests.integration_tests.utils import MOCK_USERS
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class TestUserRepositoryProjections:
+    @pytest.mark.parametrize(
+        "tg_id, expected",
+        [
+            (MOCK_USERS[0]["tg_id"], True),
+            (1, False),
+        ],
+    )
+    async def test_exists_by_tg_id(self, tg_id: int, expected: bool, session: AsyncSession) -> None:
+        assert await UserRepository.exists_by_tg_id(session=session, tg_id=tg_id) is expected
+        assert not session.identity_map
+
+    async def test_count_by(self, session: AsyncSession) -> None:
+        assert await UserRepository.count_by(session=session, tg_id=MOCK_USERS[0]["tg_id"]) == 1
+        assert await UserRepository.count_by(session=session, tg_id=1) == 0
+
+    async def test_get_columns_by(self, session: AsyncSession) -> None:
+        mock_user = MOCK_USERS[0]
+        rows = await UserRepository.get_columns_by(
+            session=session,
+            fields=["first_name", "is_active"],
+            tg_id=mock_user["tg_id"],
+        )
+
+        assert len(rows) == 1
+        assert rows[0].first_name == mock_user["first_name"]
+        assert rows[0].is_active is True
+        assert not session.identity_map
+
+    @pytest.mark.parametrize("fields", [[], ["unknown"]])
+    async def test_get_columns_by_invalid_fields(self, fields: list[str], session: AsyncSession) -> None:
+        with pytest.raises(ValueError):
+            await UserRepository.get_columns_by(session=session, fields=fields)
+
+    async def test_session_reads_its_own_direct_writes(self, session: AsyncSession) -> None:
+        tg_id = MOCK_USERS[0]["tg_id"]
+        # DML outside of the repository must still keep the session out of read coalescing
+        await session.execute(update(UserOrm).where(UserOrm.tg_id == tg_id).values(first_name="Direct"))
+        try:
+            rows = await UserRepository.get_columns_by(session=session, fields=["first_name"], tg_id=tg_id)
+            assert rows[0].first_name == "Direct"
+        finally:
+            await session.rollback()
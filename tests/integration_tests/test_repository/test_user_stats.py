@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from src.core.schemas import UserCreateS, UserUpdateS
+from src.repository import UserRepository, UserStatsRepository
+from src.repository.user_stats import SESSION_COUNTER_SHARD_KEY
+from src.utils.enum import UserCounterEnum
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class TestUserStats:
+    async def test_counters_follow_repository_writes(self, session: AsyncSession) -> None:
+        before = await UserStatsRepository.reconcile(session=session, keep_days=1)
+        tg_id = 900_000_001
+
+        await UserRepository.create(
+            session=session,
+            create_schema=UserCreateS(tg_id=tg_id, first_name="Stats", username=None, last_name=None),
+        )
+        stats = await UserStatsRepository.get_stats(session=session)
+        assert (stats.total, stats.active, stats.new_today) == (
+            before.total + 1,
+            before.active + 1,
+            before.new_today + 1,
+        )
+
+        await UserRepository.update_by_tg_id(session=session, tg_id=tg_id, update_schema=UserUpdateS(is_active=False))
+        await UserRepository.update_by_tg_id(session=session, tg_id=tg_id, update_schema=UserUpdateS(is_active=False))
+        stats = await UserStatsRepository.get_stats(session=session)
+        assert (stats.total, stats.active) == (before.total + 1, before.active)
+
+        await UserRepository.delete_by_tg_id(session=session, tg_id=tg_id)
+        stats = await UserStatsRepository.get_stats(session=session)
+        assert (stats.total, stats.active) == (before.total, before.active)
+
+        reconciled = await UserStatsRepository.reconcile(session=session, keep_days=1)
+        assert (reconciled.total, reconciled.active) == (stats.total, stats.active)
+        await session.rollback()
+
+    async def test_shards_are_summed_on_read(self, session: AsyncSession) -> None:
+        before = await UserStatsRepository.reconcile(session=session, keep_days=1)
+        for shard in (1, 2):
+            session.info[SESSION_COUNTER_SHARD_KEY] = shard
+            await UserStatsRepository.increment(session=session, deltas={UserCounterEnum.TOTAL: 1})
+        stats = await UserStatsRepository.get_stats(session=session)
+        assert stats.total == before.total + 2
+
+        # Reconciliation collapses the shards back to the real count
+        reconciled = await UserStatsRepository.reconcile(session=session, keep_days=1)
+        assert reconciled.total == before.total
+        assert (await UserStatsRepository.get_stats(session=session)).total == before.total
+        await session.rollback()
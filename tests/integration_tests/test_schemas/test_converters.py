@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+
+from src.core.models import UserOrm
+from src.core.schemas import UserS, get_list_adapter, orm_to_schemas, rows_to_schemas
+from tests.integration_tests.utils import MOCK_USERS
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class TestUserConverters:
+    async def test_orm_and_rows_give_same_schemas(self, session: AsyncSession) -> None:
+        mock_tg_ids = [mock_user["tg_id"] for mock_user in MOCK_USERS]
+
+        orm_stmt = select(UserOrm).where(UserOrm.tg_id.in_(mock_tg_ids)).order_by(UserOrm.id)
+        instances = (await session.execute(orm_stmt)).scalars().all()
+
+        rows_stmt = select(*UserOrm.__table__.columns).where(UserOrm.tg_id.in_(mock_tg_ids)).order_by(UserOrm.id)
+        rows = (await session.execute(rows_stmt)).all()
+
+        from_orm = orm_to_schemas(UserS, instances)
+        from_rows = rows_to_schemas(UserS, rows)
+
+        assert len(from_orm) == len(MOCK_USERS)
+        assert from_orm == from_rows
+        assert from_orm == [UserS.model_validate(instance) for instance in instances]
+
+    def test_empty_rows(self) -> None:
+        assert rows_to_schemas(UserS, []) == []
+
+    def test_list_adapter_is_cached(self) -> None:
+        assert get_list_adapter(UserS) is get_list_adapter(UserS)
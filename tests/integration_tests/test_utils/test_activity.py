@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from src.repository import UserRepository
+from src.repository.base import bot_session_info
+from src.tasks import flush_user_activity
+from src.utils.activity import ActivityTracker
+from tests.config import TEST_BOT_ID, test_db_manager
+from tests.integration_tests.utils import MOCK_USERS
+
+if TYPE_CHECKING:
+    from aiogram.fsm.storage.redis import RedisStorage
+
+
+class TestActivityTracker:
+    async def test_unique_users(self, redis_storage: RedisStorage) -> None:
+        tracker = ActivityTracker(redis=redis_storage.redis, key_prefix="test_activity_unique")
+        now = datetime.now(UTC)
+        for user_id, seen_at in [(1, now), (2, now), (1, now), (3, now - timedelta(days=3))]:
+            await tracker.touch(user_id, now=seen_at)
+
+        assert await tracker.unique_users(days=1, today=now.date()) == 2
+        assert await tracker.unique_users(days=7, today=now.date()) == 3
+
+    async def test_flush_moves_last_seen_forward(self, redis_storage: RedisStorage) -> None:
+        tracker = ActivityTracker(redis=redis_storage.redis, key_prefix="test_activity_flush", bot_id=TEST_BOT_ID)
+        tg_id = MOCK_USERS[0]["tg_id"]
+        seen_at = datetime.now(UTC).replace(microsecond=0)
+        await tracker.touch(tg_id, now=seen_at - timedelta(minutes=5))
+        await tracker.touch(tg_id, now=seen_at)
+
+        updated = await flush_user_activity(tracker=tracker, session_factory=test_db_manager.session_factory)
+
+        assert updated == 1
+        assert not await tracker.begin_flush()
+        async with test_db_manager.session_factory(info=bot_session_info(TEST_BOT_ID)) as session:
+            user = await UserRepository.get_by_tg_id(session=session, tg_id=tg_id)
+        assert user is not None
+        assert user.last_seen_at == seen_at
+
+    async def test_begin_flush_keeps_pending_flush(self, redis_storage: RedisStorage) -> None:
+        tracker = ActivityTracker(redis=redis_storage.redis, key_prefix="test_activity_pending")
+        now = datetime.now(UTC)
+        await tracker.touch(1, now=now)
+        assert await tracker.begin_flush()
+
+        # A second replica starting its flush before the first one is done must not replace its hash
+        await tracker.touch(2, now=now)
+        assert await tracker.begin_flush()
+
+        flushing = [user_id async for chunk in tracker.iter_flushing(batch_size=10) for user_id in chunk]
+        assert flushing == [1]
+        await tracker.end_flush()
+        assert await tracker.begin_flush()
+        assert [user_id async for chunk in tracker.iter_flushing(batch_size=10) for user_id in chunk] == [2]
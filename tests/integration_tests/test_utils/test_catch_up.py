@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+from aiogram import Dispatcher, Router
+from aiogram.methods import GetUpdates
+from aiogram.types import Chat, Message, Update, User
+
+from src.utils.catch_up import BacklogCatchUp
+
+if TYPE_CHECKING:
+    from aiogram.fsm.storage.redis import RedisStorage
+
+    from tests.mock_bot import MockedBot
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.datetime.now(),
+            chat=Chat(id=chat_id, type="private"),
+            from_user=User(id=chat_id, is_bot=False, first_name="Test"),
+            text=str(update_id),
+        ),
+    )
+
+
+class TestBacklogCatchUp:
+    async def test_catch_up(self, bot: MockedBot, dispatcher: Dispatcher, redis_storage: RedisStorage) -> None:
+        handled: list[tuple[int, int]] = []
+        router = Router()
+
+        @router.message()
+        async def handler(message: Message) -> None:
+            handled.append((message.chat.id, message.message_id))
+
+        dispatcher.include_router(router)
+        catch_up = BacklogCatchUp(redis=redis_storage.redis, concurrency=2)
+        await catch_up._mark_seen(bot=bot, update_id=3)
+
+        # MockedSession pops responses from the end, so the last batch goes first
+        bot.add_result_for(GetUpdates, ok=True, result=[])
+        bot.add_result_for(
+            GetUpdates,
+            ok=True,
+            result=[
+                make_update(1, chat_id=10),
+                make_update(2, chat_id=20),
+                make_update(3, chat_id=10),
+                make_update(4, chat_id=10),
+            ],
+        )
+
+        report = await catch_up.run(bot=bot, dispatcher=dispatcher)
+
+        assert (report.backlog, report.duplicates, report.failed, report.batches) == (4, 1, 0, 1)
+        assert [message_id for chat_id, message_id in handled if chat_id == 10] == [1, 4]
+        assert [message_id for chat_id, message_id in handled if chat_id == 20] == [2]
+        last_request = bot.get_request()
+        assert isinstance(last_request, GetUpdates)
+        assert last_request.offset == 5
+
+    async def test_failed_update_is_redelivered(
+        self, bot: MockedBot, dispatcher: Dispatcher, redis_storage: RedisStorage
+    ) -> None:
+        handled: list[int] = []
+        router = Router()
+
+        @router.message()
+        async def handler(message: Message) -> None:
+            if message.message_id == 2 and 2 not in handled:
+                handled.append(2)
+                raise RuntimeError("Handler failed")
+            handled.append(message.message_id)
+
+        dispatcher.include_router(router)
+        catch_up = BacklogCatchUp(redis=redis_storage.redis)
+        bot.add_result_for(GetUpdates, ok=True, result=[])
+        bot.add_result_for(GetUpdates, ok=True, result=[make_update(2, chat_id=20), make_update(3, chat_id=20)])
+        bot.add_result_for(
+            GetUpdates,
+            ok=True,
+            result=[make_update(1, chat_id=10), make_update(2, chat_id=20), make_update(3, chat_id=20)],
+        )
+
+        report = await catch_up.run(bot=bot, dispatcher=dispatcher)
+
+        assert (report.backlog, report.duplicates, report.retried, report.failed, report.batches) == (3, 0, 1, 0, 2)
+        # The failed update comes first on its retry and the rest of its chat waits for it
+        assert handled == [1, 2, 2, 3]
+        assert [bot.get_request().offset for _ in range(3)] == [4, 2, None]
+
+    async def test_failing_update_is_dropped_after_max_attempts(
+        self, bot: MockedBot, dispatcher: Dispatcher, redis_storage: RedisStorage
+    ) -> None:
+        router = Router()
+
+        @router.message()
+        async def handler(message: Message) -> None:
+            if message.message_id == 2:
+                raise RuntimeError("Handler failed")
+
+        dispatcher.include_router(router)
+        catch_up = BacklogCatchUp(redis=redis_storage.redis, max_attempts=2)
+        updates = [make_update(1, chat_id=10), make_update(2, chat_id=20)]
+        bot.add_result_for(GetUpdates, ok=True, result=[])
+        bot.add_result_for(GetUpdates, ok=True, result=updates[1:])
+        bot.add_result_for(GetUpdates, ok=True, result=updates)
+
+        report = await catch_up.run(bot=bot, dispatcher=dispatcher)
+
+        assert (report.backlog, report.retried, report.failed, report.batches) == (2, 1, 1, 2)
+        assert bot.get_request().offset == 3
+        # Only the update that was processed is skipped by the next catch-up
+        assert await catch_up._deduplicate(bot=bot, updates=updates) == [updates[1]]
@@ -8,6 +8,8 @@ from aiogram.methods import TelegramMethod
 from aiogram.methods.base import Response, TelegramType
 from aiogram.types import UNSET_PARSE_MODE, ResponseParameters, User
 
+from tests.config import TEST_BOT_ID
+
 
 class MockedSession(BaseSession):
     def __init__(self):
@@ -59,7 +61,7 @@ class MockedBot(Bot):
         session: MockedSession
 
     def __init__(self, **kwargs):
-        super().__init__(kwargs.pop("token", "42:TEST"), session=MockedSession(), **kwargs)
+        super().__init__(kwargs.pop("token", f"{TEST_BOT_ID}:TEST"), session=MockedSession(), **kwargs)
         self._me = User(
             id=self.id,
             is_bot=True,
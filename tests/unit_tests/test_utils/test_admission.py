@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+from typing import TYPE_CHECKING, Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.middleware import FSMContextMiddleware
+from aiogram.types import Chat, Message, TelegramObject, Update
+
+from src.middlewares import AdmissionMiddleware
+from src.utils.admission import AdmissionController, PriorityLimit
+from src.utils.catch_up import CATCH_UP_DATA_KEY
+from src.utils.enum import PriorityEnum
+from src.utils.updates import register_before_builtins
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+
+def make_controller(max_in_flight: int = 2) -> AdmissionController:
+    return AdmissionController(
+        max_in_flight=max_in_flight,
+        limits={
+            PriorityEnum.HIGH: PriorityLimit(share=1.0, max_queue=10, max_wait=1.0),
+            PriorityEnum.NORMAL: PriorityLimit(share=1.0, max_queue=1, max_wait=1.0),
+            PriorityEnum.LOW: PriorityLimit(share=0.5, max_queue=0, max_wait=0.0),
+        },
+    )
+
+
+def make_update(text: str) -> Update:
+    message = Message(message_id=1, date=datetime.datetime.now(), chat=Chat(id=1, type="private"), text=text)
+    return Update(update_id=1, message=message)
+
+
+class TestAdmissionController:
+    async def test_low_priority_is_shed_above_its_share(self) -> None:
+        controller = make_controller()
+
+        assert await controller.acquire(PriorityEnum.LOW)
+        assert not await controller.acquire(PriorityEnum.LOW)
+        assert await controller.acquire(PriorityEnum.NORMAL)
+        assert controller.snapshot()[PriorityEnum.LOW]["shed"] == 1
+
+    async def test_freed_slot_goes_to_highest_priority(self) -> None:
+        controller = make_controller()
+        for _ in range(2):
+            assert await controller.acquire(PriorityEnum.NORMAL)
+
+        normal = asyncio.create_task(controller.acquire(PriorityEnum.NORMAL))
+        high = asyncio.create_task(controller.acquire(PriorityEnum.HIGH))
+        await asyncio.sleep(0)
+        assert controller.snapshot()[PriorityEnum.HIGH]["queued"] == 1
+
+        controller.release()
+        assert await high
+        assert not normal.done()
+
+        controller.release()
+        assert await normal
+        assert controller.in_flight == 2
+
+    async def test_full_queue_and_timeout_shed(self) -> None:
+        controller = make_controller(max_in_flight=1)
+        controller.limits[PriorityEnum.NORMAL] = PriorityLimit(share=1.0, max_queue=1, max_wait=0.01)
+        assert await controller.acquire(PriorityEnum.NORMAL)
+
+        waiting = asyncio.create_task(controller.acquire(PriorityEnum.NORMAL))
+        await asyncio.sleep(0)
+        assert not await controller.acquire(PriorityEnum.NORMAL)
+        assert not await waiting
+
+        assert controller.snapshot()[PriorityEnum.NORMAL] == {"queued": 0, "admitted": 1, "shed": 2}
+        assert controller.in_flight == 1
+
+
+class TestAdmissionMiddleware:
+    async def test_classify(self) -> None:
+        middleware = AdmissionMiddleware(
+            controller=make_controller(),
+            update_types={"message": PriorityEnum.LOW},
+            commands={"start": PriorityEnum.HIGH},
+        )
+
+        assert middleware.classify(make_update("/start")) == PriorityEnum.HIGH
+        assert middleware.classify(make_update("hello")) == PriorityEnum.LOW
+
+    async def test_shed_update_skips_handler(self) -> None:
+        controller = make_controller(max_in_flight=1)
+        middleware = AdmissionMiddleware(controller=controller, default=PriorityEnum.LOW)
+        handled: list[TelegramObject] = []
+
+        async def handler(event: TelegramObject, data: dict[str, Any]) -> None:
+            handled.append(event)
+            assert await middleware(handler, make_update("nested"), {}) is None
+
+        await middleware(handler, make_update("first"), {})
+
+        assert len(handled) == 1
+        assert controller.in_flight == 0
+
+    async def test_catch_up_updates_bypass_admission(self) -> None:
+        controller = make_controller(max_in_flight=1)
+        middleware = AdmissionMiddleware(controller=controller, default=PriorityEnum.LOW)
+        handled: list[TelegramObject] = []
+
+        async def handler(event: TelegramObject, data: dict[str, Any]) -> None:
+            handled.append(event)
+
+        async def hold_slot(event: TelegramObject, data: dict[str, Any]) -> None:
+            await middleware(handler, make_update("replayed"), {CATCH_UP_DATA_KEY: True})
+
+        await middleware(hold_slot, make_update("first"), {})
+
+        assert len(handled) == 1
+        assert controller.in_flight == 0
+
+    async def test_shed_before_fsm_context(self) -> None:
+        controller = make_controller(max_in_flight=1)
+        middleware = AdmissionMiddleware(controller=controller, default=PriorityEnum.LOW)
+        dp = Dispatcher()
+        register_before_builtins(dp, middleware)
+        fsm_calls: list[TelegramObject] = []
+
+        async def count_fsm_calls(
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any],
+        ) -> Any:
+            fsm_calls.append(event)
+            return await handler(event, data)
+
+        middlewares = list(dp.update.outer_middleware)
+        assert middlewares[0] is middleware
+        fsm_index = next(index for index, item in enumerate(middlewares) if isinstance(item, FSMContextMiddleware))
+        dp.update.outer_middleware._middlewares.insert(fsm_index, count_fsm_calls)
+
+        assert await controller.acquire(PriorityEnum.LOW)
+        bot = Bot(token="42:TEST")
+        await dp.feed_update(bot, make_update("shed"))
+        await bot.session.close()
+
+        assert fsm_calls == []
+        assert controller.snapshot()[PriorityEnum.LOW]["shed"] == 1
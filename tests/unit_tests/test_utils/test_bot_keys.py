@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from aiogram.fsm.storage.base import DefaultKeyBuilder, StorageKey
+
+from src.utils.bot_keys import BotKeyBuilder, bot_key_prefix
+
+PRIMARY_BOT_ID = 100
+ADDED_BOT_ID = 200
+
+
+class TestBotKeys:
+    def test_primary_bot_keeps_single_bot_keys(self) -> None:
+        key_builder = BotKeyBuilder(primary_bot_id=PRIMARY_BOT_ID)
+        primary_key = StorageKey(bot_id=PRIMARY_BOT_ID, chat_id=1, user_id=2)
+        added_key = StorageKey(bot_id=ADDED_BOT_ID, chat_id=1, user_id=2)
+
+        assert key_builder.build(primary_key, "state") == DefaultKeyBuilder().build(primary_key, "state")
+        assert key_builder.build(added_key, "state") == f"fsm:{ADDED_BOT_ID}:1:2:state"
+
+    def test_bot_key_prefix(self) -> None:
+        assert bot_key_prefix("activity", PRIMARY_BOT_ID, primary_bot_id=PRIMARY_BOT_ID) == "activity"
+        assert bot_key_prefix("activity", ADDED_BOT_ID, primary_bot_id=PRIMARY_BOT_ID) == f"activity:{ADDED_BOT_ID}"
+        assert bot_key_prefix("activity", ADDED_BOT_ID, primary_bot_id=None) == "activity"
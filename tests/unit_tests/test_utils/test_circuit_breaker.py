@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from aiogram.methods import SendMessage
+from aiogram.types import Chat, Message, Update
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.middlewares import DegradedModeMiddleware
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError, guard_database, is_unavailable_error
+from src.utils.enum import CircuitStateEnum
+
+if TYPE_CHECKING:
+    from aiogram.types import TelegramObject
+
+    from tests.mock_bot import MockedBot
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        window_size=4,
+        min_calls=4,
+        failure_rate=0.5,
+        slow_call_duration=0.5,
+        open_duration=0.05,
+        half_open_probes=2,
+    )
+
+
+def state_of(breaker: CircuitBreaker) -> CircuitStateEnum:
+    # Read through a call so mypy does not narrow `state` across the calls that change it
+    return breaker.state
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for failed in (False, True, False, True):
+        breaker.before_call()
+        breaker.record(duration=0.01, failed=failed)
+
+
+class TestCircuitBreaker:
+    async def test_opens_on_failure_rate(self) -> None:
+        breaker = make_breaker()
+        for _ in range(3):
+            breaker.record(duration=0.01, failed=True)
+        assert state_of(breaker) == CircuitStateEnum.CLOSED
+
+        breaker.record(duration=0.01)
+        assert state_of(breaker) == CircuitStateEnum.OPEN
+        assert breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    async def test_slow_calls_count_as_failures(self) -> None:
+        breaker = make_breaker()
+        for duration in (0.6, 0.01, 0.7, 0.01):
+            breaker.record(duration=duration)
+        assert state_of(breaker) == CircuitStateEnum.OPEN
+
+    async def test_half_open_probes_close_the_circuit(self) -> None:
+        breaker = make_breaker()
+        trip(breaker)
+        await asyncio.sleep(0.05)
+
+        breaker.before_call()
+        breaker.before_call()
+        assert state_of(breaker) == CircuitStateEnum.HALF_OPEN
+        # Only `half_open_probes` statements reach the database while it is being tested
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record(duration=0.01)
+        breaker.record(duration=0.01)
+        assert state_of(breaker) == CircuitStateEnum.CLOSED
+        breaker.before_call()
+
+    async def test_failed_probe_reopens(self) -> None:
+        breaker = make_breaker()
+        trip(breaker)
+        await asyncio.sleep(0.05)
+
+        breaker.before_call()
+        breaker.record(duration=0.01, failed=True)
+        assert state_of(breaker) == CircuitStateEnum.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    async def test_unavailable_errors(self) -> None:
+        class QueryCanceledError(Exception):
+            sqlstate = "57014"
+
+        class UniqueViolationError(Exception):
+            sqlstate = "23505"
+
+        assert is_unavailable_error(TimeoutError())
+        assert is_unavailable_error(ConnectionRefusedError())
+        assert is_unavailable_error(QueryCanceledError())
+        assert not is_unavailable_error(UniqueViolationError())
+        assert is_unavailable_error(UniqueViolationError(), is_disconnect=True)
+
+    async def test_pool_timeouts_are_failures(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        breaker = make_breaker()
+        engine = create_async_engine("postgresql+asyncpg://test@localhost/test", pool_size=1, max_overflow=0)
+        guard_database(engine=engine, session_factory=sessionmaker(), breaker=breaker)
+
+        def exhausted_pool() -> Any:
+            raise PoolTimeoutError("QueuePool limit of size 1 overflow 0 reached")
+
+        monkeypatch.setattr(engine.sync_engine.pool, "_do_get", exhausted_pool)
+        for _ in range(2):
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+            breaker.record(duration=0.01)
+
+        assert state_of(breaker) == CircuitStateEnum.OPEN
+        await engine.dispose()
+
+
+class TestDegradedModeMiddleware:
+    async def test_open_circuit_answers_try_later(self, bot: MockedBot, json_text: dict[str, Any]) -> None:
+        breaker = make_breaker()
+        trip(breaker)
+        middleware = DegradedModeMiddleware(breaker=breaker, texts=json_text)
+        update = Update.model_validate(
+            {
+                "update_id": 1,
+                "message": {
+                    "message_id": 1,
+                    "date": datetime.datetime.now(),
+                    "chat": {"id": 1, "type": "private"},
+                    "text": "/start",
+                },
+            },
+            context={"bot": bot},
+        )
+        reply = Message(message_id=2, date=datetime.datetime.now(), chat=Chat(id=1, type="private"), text="ok")
+        bot.add_result_for(SendMessage, ok=True, result=reply)
+
+        async def handler(event: TelegramObject, data: dict[str, Any]) -> None:
+            breaker.before_call()
+
+        assert await middleware(handler, update, {}) is None
+
+        request = bot.get_request()
+        assert isinstance(request, SendMessage)
+        assert request.text == json_text["try_later"]
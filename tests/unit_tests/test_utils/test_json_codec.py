@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from src.utils.enum import JsonCodecEnum
+from src.utils.json_codec import STDLIB_CODEC, get_json_codec
+
+DATA = {"step": 2, "answers": ["yes", "no"], "name": "Дэвид"}
+
+
+@pytest.fixture(autouse=True)
+def clear_codec_cache() -> None:
+    get_json_codec.cache_clear()
+
+
+class TestJsonCodec:
+    @pytest.mark.parametrize("name", list(JsonCodecEnum))
+    def test_round_trip(self, name: JsonCodecEnum) -> None:
+        codec = get_json_codec(name)
+        dumped = codec.dumps(DATA)
+
+        assert isinstance(dumped, str)
+        assert codec.loads(dumped) == DATA
+        assert STDLIB_CODEC.loads(dumped) == DATA
+
+    def test_falls_back_to_stdlib_without_orjson(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setitem(sys.modules, "orjson", None)
+
+        assert get_json_codec(JsonCodecEnum.ORJSON) is STDLIB_CODEC
+        assert get_json_codec(JsonCodecEnum.AUTO) is STDLIB_CODEC
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+import logging
+
+from src.utils.logger import JsonFormatter, RateLimitFilter, SamplingFilter, UpdateContextFilter, update_id_var
+
+
+def make_record(name: str = "app.module", level: int = logging.INFO, msg: str = "message %s") -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, ("arg",), None)
+
+
+class TestLoggingFilters:
+    def test_update_context(self) -> None:
+        context_filter = UpdateContextFilter()
+        token = update_id_var.set(42)
+        try:
+            record = make_record()
+            context_filter.filter(record)
+        finally:
+            update_id_var.reset(token)
+        assert record.__dict__["update_id"] == 42
+
+        record = make_record()
+        context_filter.filter(record)
+        assert record.__dict__["update_id"] == "-"
+
+    def test_rate_limit_matches_child_loggers_and_spares_errors(self) -> None:
+        rate_limit_filter = RateLimitFilter({"app": 2})
+
+        assert [rate_limit_filter.filter(make_record()) for _ in range(3)] == [True, True, False]
+        assert rate_limit_filter.filter(make_record(level=logging.ERROR))
+        assert rate_limit_filter.filter(make_record(name="other"))
+        assert rate_limit_filter.dropped == 1
+
+    def test_sampling(self) -> None:
+        sampling_filter = SamplingFilter({"app": 0.0, "app.keep": 1.0})
+
+        assert not sampling_filter.filter(make_record())
+        assert sampling_filter.filter(make_record(name="app.keep.child"))
+        assert sampling_filter.filter(make_record(level=logging.WARNING))
+
+
+def test_json_formatter() -> None:
+    record = make_record()
+    record.update_id = 7
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["message"] == "message arg"
+    assert payload["update_id"] == 7
+    assert payload["logger"] == "app.module"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import datetime
+import pstats
+from typing import TYPE_CHECKING, Any
+
+from aiogram import Router
+from aiogram.filters import Command, CommandStart
+from aiogram.types import Chat, Message, TelegramObject, Update
+
+from src.middlewares import ProfilingMiddleware
+from src.utils.profiler import UpdateProfiler, stats_file_name
+from src.utils.updates import registered_commands
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def make_update(text: str) -> Update:
+    message = Message(message_id=1, date=datetime.datetime.now(), chat=Chat(id=1, type="private"), text=text)
+    return Update(update_id=1, message=message)
+
+
+async def handler(event: TelegramObject, data: dict[str, Any]) -> str:
+    return "handled"
+
+
+class TestProfilingMiddleware:
+    async def test_idle_profiler_does_not_sample(self, tmp_path: Path) -> None:
+        profiler = UpdateProfiler(output_dir=tmp_path)
+        middleware = ProfilingMiddleware(profiler=profiler)
+
+        assert await middleware(handler, make_update("/start"), {}) == "handled"
+        assert profiler.flush() == []
+
+    async def test_samples_one_in_n_per_handler_key(self, tmp_path: Path) -> None:
+        profiler = UpdateProfiler(output_dir=tmp_path)
+        profiler.enable(sample_every=2)
+        middleware = ProfilingMiddleware(profiler=profiler, commands=["start"])
+
+        for text in ["/start", "/start", "hello", "hello"]:
+            assert await middleware(handler, make_update(text), {}) == "handled"
+        profiler.disable()
+
+        assert not profiler.active
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["message.prof", "message.start.prof"]
+        assert pstats.Stats(str(tmp_path / "message.start.prof")).total_calls > 0  # type: ignore[attr-defined]
+
+    async def test_unregistered_commands_share_one_key(self, tmp_path: Path) -> None:
+        profiler = UpdateProfiler(output_dir=tmp_path)
+        profiler.enable(sample_every=1)
+        middleware = ProfilingMiddleware(profiler=profiler, commands=["start"])
+
+        for text in ["/a/b", "/../../etc", "/unknown"]:
+            assert await middleware(handler, make_update(text), {}) == "handled"
+        profiler.disable()
+
+        assert [path.name for path in tmp_path.iterdir()] == ["message.-other-.prof"]
+
+    def test_stats_file_name(self) -> None:
+        assert stats_file_name("message.start") == "message.start.prof"
+        assert stats_file_name("../message.a/b") == "-message.a-b.prof"
+
+    def test_registered_commands(self) -> None:
+        router, child = Router(), Router()
+        router.include_router(child)
+        router.message.register(handler, CommandStart())
+        child.message.register(handler, Command("Stats", "help"))
+
+        assert registered_commands(router) == {"start", "stats", "help"}
+
+    def test_window_expires(self, tmp_path: Path) -> None:
+        profiler = UpdateProfiler(output_dir=tmp_path)
+        profiler.enable(sample_every=1, duration=0)
+
+        assert not profiler.active
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Chat, Message, Update, User
+
+from src.config import RateLimitConfig
+from src.middlewares import ThrottlingMiddleware
+from src.utils.rate_limit import TokenBucketRateLimiter
+from src.utils.updates import extract_command, register_before_builtins
+
+if TYPE_CHECKING:
+    from aiogram.fsm.storage.base import StorageKey
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr("src.utils.rate_limit.time.monotonic", fake_clock)
+    return fake_clock
+
+
+class TestTokenBucketRateLimiter:
+    async def test_burst_then_refill(self, clock: FakeClock) -> None:
+        limiter = TokenBucketRateLimiter()
+
+        assert [await limiter.hit("user", rate=2, period=1.0) for _ in range(2)] == [0.0, 0.0]
+        assert await limiter.hit("user", rate=2, period=1.0) == pytest.approx(0.5)
+        assert await limiter.hit("other", rate=2, period=1.0) == 0.0
+
+        clock.now += 0.5
+        assert await limiter.hit("user", rate=2, period=1.0) == 0.0
+        assert await limiter.hit("user", rate=2, period=1.0) > 0
+
+    async def test_evicts_least_recently_used(self, clock: FakeClock) -> None:
+        limiter = TokenBucketRateLimiter(max_keys=2)
+        await limiter.hit("first", rate=1, period=10.0)
+        await limiter.hit("second", rate=1, period=10.0)
+        await limiter.hit("first", rate=1, period=10.0)
+
+        clock.now += 1.0
+        await limiter.hit("third", rate=1, period=10.0)
+
+        # Only the bucket hit longest ago is dropped, the others keep their limits
+        assert await limiter.hit("first", rate=1, period=10.0) > 0
+        assert await limiter.hit("second", rate=1, period=10.0) == 0.0
+
+
+class CountingStorage(MemoryStorage):
+    def __init__(self) -> None:
+        super().__init__()
+        self.state_reads = 0
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        self.state_reads += 1
+        return await super().get_state(key)
+
+
+class TestThrottlingMiddleware:
+    async def test_throttled_updates_skip_fsm_storage(self, clock: FakeClock) -> None:
+        storage = CountingStorage()
+        dp = Dispatcher(storage=storage)
+        handled: list[int] = []
+
+        @dp.message()
+        async def handler(message: Message) -> None:
+            handled.append(message.message_id)
+
+        limiter = TokenBucketRateLimiter()
+        register_before_builtins(dp, ThrottlingMiddleware(limiter=limiter, default=RateLimitConfig(rate=1, period=10)))
+        bot = Bot(token="42:TEST")
+        user = User(id=7, is_bot=False, first_name="Flood")
+        for update_id in (1, 2, 3):
+            message = Message(
+                message_id=update_id,
+                date=datetime.datetime.now(),
+                chat=Chat(id=7, type="private"),
+                from_user=user,
+                text="hi",
+            )
+            await dp.feed_update(bot, Update(update_id=update_id, message=message))
+
+        assert handled == [1]
+        assert storage.state_reads == 1
+        await bot.session.close()
+
+
+@pytest.mark.parametrize(
+    "text, command",
+    [
+        ("/start", "start"),
+        ("/Start@my_bot payload", "start"),
+        ("hello /start", None),
+        ("/", None),
+        (None, None),
+    ],
+)
+def test_extract_command(text: str | None, command: str | None) -> None:
+    message = Message(
+        message_id=1,
+        date=datetime.datetime.now(),
+        chat=Chat(id=1, type="private"),
+        text=text,
+    )
+    assert extract_command(message) == command
+    assert extract_command(Update(update_id=1, message=message)) == command
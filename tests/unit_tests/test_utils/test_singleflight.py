@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.utils.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_share_one_execution(self) -> None:
+        single_flight = SingleFlight()
+        calls = 0
+
+        async def query() -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 42
+
+        results = await asyncio.gather(*(single_flight.do("key", query) for _ in range(10)))
+
+        assert results == [42] * 10
+        assert calls == 1
+        assert single_flight.stats.executed == 1
+        assert single_flight.stats.coalesced == 9
+
+    async def test_different_keys_run_separately(self) -> None:
+        single_flight = SingleFlight()
+
+        async def query() -> None:
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(single_flight.do("a", query), single_flight.do("b", query))
+
+        assert single_flight.stats.executed == 2
+        assert single_flight.stats.coalesced == 0
+
+    async def test_exception_is_shared_with_waiters(self) -> None:
+        single_flight = SingleFlight()
+
+        async def query() -> None:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*(single_flight.do("key", query) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert single_flight.stats.executed == 1
+
+    async def test_waiter_retries_when_leader_is_cancelled(self) -> None:
+        single_flight = SingleFlight()
+
+        async def query() -> str:
+            await asyncio.sleep(0.01)
+            return "done"
+
+        leader = asyncio.create_task(single_flight.do("key", query))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(single_flight.do("key", query))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await waiter == "done"
+        assert single_flight.stats.executed == 2
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from aiogram.types import Chat, Message, TelegramObject, Update
+
+from src.middlewares import LoggingContextMiddleware, SpanMiddleware, TracingMiddleware
+from src.utils.tracing import AbstractSpanExporter, Tracer
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from src.utils.tracing import Span
+
+
+class MemorySpanExporter(AbstractSpanExporter):
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    async def export(self, spans: Sequence[Span]) -> None:
+        self.spans.extend(spans)
+
+
+def make_update() -> Update:
+    message = Message(message_id=1, date=datetime.datetime.now(), chat=Chat(id=1, type="private"), text="hi")
+    return Update(update_id=7, message=message)
+
+
+class TestTracer:
+    async def test_nested_spans_share_trace(self) -> None:
+        exporter = MemorySpanExporter()
+        tracer = Tracer(exporter=exporter, sample_rate=1.0)
+
+        with tracer.trace("update"), tracer.span("middleware"), tracer.span("sql", kind="client"):
+            pass
+        assert await tracer.flush() == 3
+
+        sql, middleware, update = exporter.spans
+        assert {span.trace_id for span in exporter.spans} == {update.trace_id}
+        assert (update.parent_id, middleware.parent_id, sql.parent_id) == (None, update.span_id, middleware.span_id)
+        assert all(span.end_ns >= span.start_ns for span in exporter.spans)
+
+    async def test_unsampled_trace_records_nothing(self) -> None:
+        exporter = MemorySpanExporter()
+        tracer = Tracer(exporter=exporter, sample_rate=0.0)
+
+        with tracer.trace("update") as root, tracer.span("middleware") as child:
+            assert root is None
+            assert child is None
+        assert await tracer.flush() == 0
+
+    async def test_error_is_recorded(self) -> None:
+        exporter = MemorySpanExporter()
+        tracer = Tracer(exporter=exporter, sample_rate=1.0)
+
+        with pytest.raises(ValueError), tracer.trace("update"):
+            raise ValueError("boom")
+        await tracer.flush()
+
+        assert exporter.spans[0].error == "ValueError('boom')"
+
+
+class TestTracingMiddleware:
+    async def test_middleware_spans(self) -> None:
+        exporter = MemorySpanExporter()
+        tracer = Tracer(exporter=exporter, sample_rate=1.0)
+        wrapped = SpanMiddleware(tracer=tracer, middleware=LoggingContextMiddleware())
+
+        async def handler(event: TelegramObject, data: dict[str, Any]) -> str:
+            return "handled"
+
+        async def inner(event: TelegramObject, data: dict[str, Any]) -> str:
+            result: str = await wrapped(handler, event, data)
+            return result
+
+        assert await TracingMiddleware(tracer=tracer)(inner, make_update(), {}) == "handled"
+        await tracer.flush()
+
+        assert [span.name for span in exporter.spans] == ["middleware.LoggingContextMiddleware", "update"]
+        assert exporter.spans[1].attributes == {"update_id": 7, "event_type": "message"}
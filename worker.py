@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import signal
+from collections.abc import Sequence
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.enums import ParseMode
+from redis.asyncio import Redis
+
+from src.config import settings
+from src.core import db_manager
+from src.jobs import JobQueue, Worker
+from src.utils.json_codec import get_json_codec
+from src.utils.logger import configure_logging
+
+log = logging.getLogger(__name__)
+
+
+async def main(
+    bot_tokens: Sequence[str] = settings.bot.all_tokens,
+    redis_url: str = settings.redis.url,
+) -> None:
+    log.info("Starting worker for %d bot(s)...", len(bot_tokens))
+    codec = get_json_codec(settings.serialization.json_codec)
+    # Jobs run as the bot that enqueued them; all bots share one HTTP session
+    bot_session = AiohttpSession(json_loads=codec.loads, json_dumps=codec.dumps)
+    bots = [
+        Bot(token=token, session=bot_session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+        for token in bot_tokens
+    ]
+    redis: Redis = Redis.from_url(url=redis_url)
+
+    worker = Worker(
+        queue=JobQueue(redis=redis, prefix=settings.jobs.prefix),
+        session_factory=db_manager.session_factory,
+        bots=bots,
+        concurrency=settings.jobs.concurrency,
+        visibility_timeout=settings.jobs.visibility_timeout,
+        max_retries=settings.jobs.max_retries,
+        backoff_base=settings.jobs.backoff_base,
+        backoff_max=settings.jobs.backoff_max,
+        poll_interval=settings.jobs.poll_interval,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await bot_session.close()
+        await redis.aclose()
+        await db_manager.engine.dispose()
+        log.info("Shutdown complete")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())